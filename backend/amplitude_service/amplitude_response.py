@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import tkinter as tk
 
+from json_files import write_json_atomic  # Run from backend/: python -m amplitude_service.amplitude_response <rating>
+
 
 load_dotenv()
 
@@ -137,9 +139,8 @@ def main():
     config['MIN_LOOK_AWAY_DURATION'] = recommended_value
     config['last_updated'] = datetime.utcnow().isoformat()
     
-    # Write back
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=2)
+    # Write back atomically so a running eye tracker never reads a half-written file
+    write_json_atomic(config, config_file)
     
     print(f"✅ Updated MIN_LOOK_AWAY_DURATION to {recommended_value}")
 
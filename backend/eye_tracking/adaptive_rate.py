@@ -0,0 +1,62 @@
+"""
+Adaptive Gaze Sampling
+Lowers the landmarker rate while the user has been steadily looking at the
+screen, and snaps back to the full rate the moment the gaze drifts toward
+the edge of the on-screen zone or the face is lost.
+
+The slowest rate is bounded so a look away is always noticed within
+max_delay_fraction * MIN_LOOK_AWAY_DURATION seconds.
+"""
+
+
+class AdaptiveRateScheduler:
+    """Chooses the target landmarker FPS from the recent focus stability"""
+    def __init__(self, base_fps, min_look_away, min_fps=2.0, stable_after=20.0, near_edge=0.7,
+                 max_delay_fraction=0.25):
+        """
+        Args:
+            base_fps: Full rate (None = every camera frame)
+            min_look_away: Current MIN_LOOK_AWAY_DURATION, used to bound the slowest rate
+            min_fps: Floor for the slowed-down rate
+            stable_after: Seconds of steady on-screen gaze before each halving of the rate
+            near_edge: edge_ratio (0 = center, 1 = threshold) above which the gaze counts as drifting
+            max_delay_fraction: Worst-case extra detection delay, as a fraction of min_look_away
+        """
+        self.base_fps = base_fps
+        self.min_look_away = min_look_away
+        self.min_fps = min_fps
+        self.stable_after = stable_after
+        self.near_edge = near_edge
+        self.max_delay_fraction = max_delay_fraction
+        self._stable_since = None
+        self.current_fps = base_fps
+
+    @property
+    def floor_fps(self):
+        """Slowest allowed rate: min_fps, raised if needed to honor the detection delay bound"""
+        bound = self.max_delay_fraction * self.min_look_away
+        floor = max(self.min_fps, 1.0 / bound) if bound > 0 else self.min_fps
+        return min(floor, self.base_fps) if self.base_fps else floor
+
+    def update(self, face_found, on_screen, edge_ratio, timestamp):
+        """
+        Feed one analyzed frame.
+
+        Returns:
+            Target FPS for the landmarker (None = every camera frame)
+        """
+        steady = face_found and on_screen and edge_ratio is not None and edge_ratio < self.near_edge
+        if not steady:
+            self._stable_since = None
+            self.current_fps = self.base_fps
+            return self.current_fps
+
+        if self._stable_since is None:
+            self._stable_since = timestamp
+        halvings = int((timestamp - self._stable_since) // self.stable_after)
+        if halvings == 0:
+            self.current_fps = self.base_fps
+        else:
+            full = self.base_fps or 30.0  # "every frame" is treated as a typical webcam rate
+            self.current_fps = max(full / (2 ** halvings), self.floor_fps)
+        return self.current_fps
@@ -0,0 +1,92 @@
+"""
+Calibration Storage
+Saved calibrations live in backend/calibration.json, keyed by camera and
+resolution so a laptop webcam and an external camera don't share a center.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from json_files import write_json_atomic
+
+CALIBRATION_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'calibration.json'))
+
+
+def camera_key(video_source, width, height):
+    """Storage key for a camera source at a given resolution, e.g. 'camera0@1280x720'"""
+    source = f"camera{video_source}" if isinstance(video_source, int) else os.path.basename(str(video_source))
+    return f"{source}@{int(width)}x{int(height)}"
+
+
+def _read(path):
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    # Older files hold a single unkeyed {"center_h", "center_v"}
+    if 'calibrations' not in data and 'center_h' in data and 'center_v' in data:
+        return {'legacy': {'center_h': data['center_h'], 'center_v': data['center_v'], 'saved_at': ''}}
+    calibrations = data.get('calibrations', {})
+    return calibrations if isinstance(calibrations, dict) else {}
+
+
+def _entry(key, path):
+    calibrations = _read(path)
+    if key is not None:
+        return calibrations.get(key) or calibrations.get('legacy')
+    if calibrations:
+        return max(calibrations.values(), key=lambda e: e.get('saved_at', ''))
+    return None
+
+
+def load_calibration(key=None, path=CALIBRATION_FILE):
+    """
+    Look up a saved calibration.
+
+    Args:
+        key: camera_key() to load; None returns the most recently saved one.
+             A legacy unkeyed calibration is returned for any key that has no entry of its own.
+
+    Returns:
+        (center_h, center_v) or None
+    """
+    entry = _entry(key, path)
+    if not entry:
+        return None
+    try:
+        return float(entry['center_h']), float(entry['center_v'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def load_mapping(key=None, path=CALIBRATION_FILE):
+    """Saved multi-point gaze mapping (a GazeMapping.to_dict() dict) for key, or None"""
+    entry = _entry(key, path)
+    if not entry:
+        return None
+    return entry.get('mapping')
+
+
+def save_calibration(key, center_h, center_v, mapping=None, path=CALIBRATION_FILE):
+    """
+    Store a calibration under key, replacing the file atomically.
+
+    Args:
+        mapping: GazeMapping.to_dict() from multi-point calibration (optional)
+    """
+    calibrations = _read(path)
+    calibrations.pop('legacy', None)
+    calibrations[key] = {
+        'center_h': center_h,
+        'center_v': center_v,
+        'saved_at': datetime.utcnow().isoformat(),
+    }
+    if mapping is not None:
+        calibrations[key]['mapping'] = mapping
+
+    write_json_atomic({'calibrations': calibrations}, path)
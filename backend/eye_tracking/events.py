@@ -0,0 +1,102 @@
+"""
+Gaze Event Bus
+The gaze loop publishes events onto a bounded queue and returns immediately;
+a dispatcher thread delivers them to subscribers (analytics, logging, ...),
+so a slow handler can never stall a frame. When the queue is full new events
+are dropped and counted rather than blocking the publisher.
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from eye_tracking.focus_state import LOOK_AWAY_STARTED, LOOK_AWAY_ENDED
+
+# kind: one of the event constants in focus_state.py
+# timestamp: monotonic capture time of the frame that caused it
+# wall_time: time.time() when it was published
+# data: dict of event-specific details
+GazeEvent = namedtuple("GazeEvent", ["kind", "timestamp", "wall_time", "data"])
+
+_STOP = object()
+
+
+class EventBus:
+    """Bounded publish/subscribe queue with a single dispatcher thread"""
+    def __init__(self, maxsize=256):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._subscribers = []
+        self._thread = None
+        self.published = 0
+        self.dropped = 0
+        self.dispatched = 0
+        self.handler_errors = 0
+
+    def subscribe(self, handler, kinds=None):
+        """Call handler(event) on the dispatcher thread for every event, or only for the given kinds"""
+        self._subscribers.append((handler, frozenset(kinds) if kinds else None))
+
+    def publish(self, kind, timestamp, **data):
+        """Queue an event without blocking. Returns False if it had to be dropped"""
+        try:
+            self._queue.put_nowait(GazeEvent(kind, timestamp, time.time(), data))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.published += 1
+        return True
+
+    @property
+    def queued(self):
+        return self._queue.qsize()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="EventDispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Deliver everything already queued, then stop the dispatcher"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        print(f"📊 Events: {self.published} published, {self.dispatched} dispatched, "
+              f"{self.dropped} dropped, {self.handler_errors} handler errors")
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                break
+            for handler, kinds in self._subscribers:
+                if kinds is not None and event.kind not in kinds:
+                    continue
+                try:
+                    handler(event)
+                except Exception as e:
+                    self.handler_errors += 1
+                    print(f"⚠️  Gaze event handler failed on {event.kind}: {e}")
+            self.dispatched += 1
+
+
+def forward_to_metrics(metrics):
+    """Handler that feeds look-away events into a SessionMetrics-style object"""
+    def handle(event):
+        if event.kind == LOOK_AWAY_STARTED:
+            metrics.start_look_away(event.wall_time)
+        elif event.kind == LOOK_AWAY_ENDED:
+            metrics.end_look_away(event.wall_time)
+    return handle
+
+
+def log_event(event):
+    """Handler that prints every event"""
+    details = ", ".join(f"{k}={v}" for k, v in event.data.items())
+    print(f"👁️  {event.kind}" + (f" ({details})" if details else ""))
@@ -1,29 +1,95 @@
 import cv2
 import numpy as np
-from collections import deque
+import functools
 import time
 import mediapipe as mp
-import json
 import os
 
+if __name__ == "__main__" and not __package__:
+    # Run as a file: backend/ isn't on the import path, so the eye_tracking.* imports below would fail
+    raise SystemExit("Run the eye tracker from backend/: python -m eye_tracking.eye_tracker")
+
+from eye_tracking.pipeline import LatestSlot, CameraReader, InferenceWorker
+from eye_tracking.focus_state import GazeDecider, FacePresenceTracker, LOOK_AWAY_ENDED, ALARM_STARTED
+from eye_tracking.events import EventBus, forward_to_metrics
+from eye_tracking.preview import AlarmWindow, describe_status, PREVIEW, FULL
+from eye_tracking.face_roi import FaceRoiTracker
+from eye_tracking.gaze_filters import make_filter, MOVING_AVERAGE
+from eye_tracking.gaze_mapping import GazeMapping, fit_gaze_mapping, CALIBRATION_TARGETS, TERMS
+from eye_tracking.calibration_store import camera_key, load_calibration, load_mapping, save_calibration
+from eye_tracking.tracker_config import TrackerConfig, ConfigWatcher, load_tracker_config
+from eye_tracking.adaptive_rate import AdaptiveRateScheduler
+from eye_tracking.stage_profiler import StageProfiler
+from eye_tracking.presence_gate import PresenceGate
+from eye_tracking.gaze_heatmap import GazeHeatmap
+from eye_tracking.gaze_log import GazeLogRecorder
+
 VIDEO_CAPTURE = 0
 H_THRESHOLD, V_THRESHOLD = 0.04, 0.04
 ALARM_DURATION = 15
+TARGET_FPS = 10  # Landmarker runs per second while streaming (None = every camera frame)
+DISPLAY_MODE = PREVIEW  # HEADLESS, PREVIEW or FULL (see preview.py)
+PREVIEW_FPS = 5
+PREVIEW_WIDTH = 480
+FACE_ROI = True  # Feed the landmarker a crop around the last known face
+ROI_INPUT_SIZE = 256  # px, longest side of the crop after downscaling (None = no downscale)
+PRESENCE_GATE = True  # While no face is in view, only wake the landmarker when a Haar cascade sees one
+PRESENCE_IDLE_SECONDS = 2.0  # Time without a face before the gate takes over
+PRESENCE_RECHECK_SECONDS = 2.0  # Landmarker still runs at least this often while gated
+SMOOTHING = MOVING_AVERAGE  # MOVING_AVERAGE, EMA or ONE_EURO (see gaze_filters.py)
+SMOOTHING_PARAMS = {"window": 0.33}  # Seconds; about the old 10-frame window at 30 fps
+CALIBRATION_MODE = "multipoint"  # "center" (single point + H/V box) or "multipoint" (screen mapping)
+MULTIPOINT_SETTLE_SECONDS = 0.8  # Time to move the eyes to a new dot before sampling it
+MULTIPOINT_COLLECT_SECONDS = 1.0  # Time each dot is sampled for
+MULTIPOINT_CANVAS = (1280, 720)  # Drawn full screen, so only the aspect matters
+VALIDATION_SECONDS = 1.5  # How long a saved calibration is checked against the user's resting gaze
+VALIDATION_MIN_SAMPLES = 8  # Face detections needed for that check to count
 MIN_LOOK_AWAY_DURATION = 3  # Default value
+RECORD_GAZE_LOG = False  # Save every analyzed frame to session_data/*.gazelog (see gaze_log.py)
+
+ADAPTIVE_RATE = True  # Slow the landmarker down during long steady on-screen stretches
+ADAPTIVE_MIN_FPS = 2.0
+ADAPTIVE_STABLE_SECONDS = 20.0  # Steady time before each halving of the rate
+ADAPTIVE_MAX_DELAY_FRACTION = 0.25  # Worst-case added detection delay, as a fraction of MIN_LOOK_AWAY_DURATION
+CONFIG_POLL_SECONDS = 2.0  # How often a running stream checks config.json for changes
+
+DEFAULT_CONFIG = TrackerConfig(
+    min_look_away=MIN_LOOK_AWAY_DURATION,
+    alarm_duration=ALARM_DURATION,
+    h_threshold=H_THRESHOLD,
+    v_threshold=V_THRESHOLD,
+    target_fps=TARGET_FPS,
+)
+
 
-# Load MIN_LOOK_AWAY_DURATION from config.json if it exists
+# Load thresholds from config.json if it exists
 def load_config():
-    """Load configuration from config.json, return default if not found"""
-    config_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config.json'))
-    try:
-        with open(config_file, 'r') as f:
-            config = json.load(f)
-            return config.get('MIN_LOOK_AWAY_DURATION', MIN_LOOK_AWAY_DURATION)
-    except (FileNotFoundError, json.JSONDecodeError, KeyError):
-        return MIN_LOOK_AWAY_DURATION
+    """Load configuration from config.json, return defaults for anything missing or invalid"""
+    return load_tracker_config(DEFAULT_CONFIG)
+
+
+# Load the values at module import time (a running stream also picks up later changes)
+_config = load_config()
+MIN_LOOK_AWAY_DURATION, ALARM_DURATION = _config.min_look_away, _config.alarm_duration
+H_THRESHOLD, V_THRESHOLD = _config.h_threshold, _config.v_threshold
+TARGET_FPS = _config.target_fps
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'face_landmarker.task')
+MODEL_URL = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
+
+
+@functools.lru_cache(maxsize=1)
+def load_model_buffer():
+    """Read the face landmarker model into memory once per process, downloading it if needed"""
+    if not os.path.exists(MODEL_PATH):
+        print("Downloading face landmarker model...")
+        import urllib.request
+        urllib.request.urlretrieve(MODEL_URL, MODEL_PATH)
+        print("Model downloaded!")
+
+    with open(MODEL_PATH, 'rb') as f:
+        return f.read()
 
-# Load the value at module import time
-MIN_LOOK_AWAY_DURATION = load_config() 
 
 # Initialize MediaPipe
 def init_mediapipe():
@@ -33,237 +99,514 @@ def init_mediapipe():
     VisionRunningMode = mp.tasks.vision.RunningMode
 
     options = FaceLandmarkerOptions(
-        base_options=BaseOptions(model_asset_path='face_landmarker.task'),
+        base_options=BaseOptions(model_asset_buffer=load_model_buffer()),
         running_mode=VisionRunningMode.VIDEO,
         num_faces=1
     )
 
-    # Download model if needed
-    if not os.path.exists('face_landmarker.task'):
-        print("Downloading face landmarker model...")
-        import urllib.request
-        model_url = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
-        urllib.request.urlretrieve(model_url, "face_landmarker.task")
-        print("Model downloaded!")
-
     return FaceLandmarker.create_from_options(options)
 
 
-def calibrate_eye_tracker():
-    """Calibration phase - returns calibration values"""
+class TrackerSession:
+    """
+    Camera, landmarker and capture/inference threads shared by calibration and streaming.
+
+    The model is loaded and the camera opened once; calibration hands straight
+    into streaming on the same landmarker with a continuous timestamp clock.
+    """
+    def __init__(self, video_source=VIDEO_CAPTURE, face_roi=FACE_ROI, roi_input_size=ROI_INPUT_SIZE,
+                 presence_gate=PRESENCE_GATE):
+        self.landmarker = init_mediapipe()
+        self.video_source = video_source
+        self.cap = cv2.VideoCapture(video_source)
+        self.frame_slot, self.gaze_slot = LatestSlot(), LatestSlot()
+        self.roi = FaceRoiTracker(max_input_size=roi_input_size, enabled=face_roi)
+        self.profiler = StageProfiler()
+        self.gate = PresenceGate(idle_after=PRESENCE_IDLE_SECONDS, recheck_interval=PRESENCE_RECHECK_SECONDS,
+                                 enabled=presence_gate)
+        self.reader = CameraReader(self.cap, self.frame_slot, profiler=self.profiler)
+        self.worker = InferenceWorker(self.landmarker, self.frame_slot, self.gaze_slot, roi=self.roi,
+                                      profiler=self.profiler, gate=self.gate)
+        self._started = False
+        self._closed = False
+
+    def start(self):
+        if not self._started:
+            self.reader.start()
+            self.worker.start()
+            self._started = True
+        return self
+
+    def set_target_fps(self, target_fps):
+        """Limit landmarker runs per second (None = every camera frame)"""
+        self.worker.governor.set_target_fps(target_fps)
+
+    @property
+    def camera_key(self):
+        """Key that saved calibrations for this camera and resolution are stored under"""
+        width = self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)
+        height = self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        return camera_key(self.video_source, width, height)
+
+    def next_sample(self, timeout=0.05):
+        """Newest GazeSample not yet taken, or None if none arrived within timeout"""
+        return self.gaze_slot.get(timeout=timeout)
+
+    @property
+    def finished(self):
+        """True once the camera has stopped delivering frames and everything was consumed"""
+        return self.gaze_slot.closed
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        self.reader.stop()
+        self.worker.stop()
+        if self._started:
+            self.worker.join(timeout=2)
+            self.reader.join(timeout=2)
+        print(f"📊 Pipeline: {self.frame_slot.put_count} frames read, {self.gaze_slot.put_count} inferred, "
+              f"{self.worker.governor.skipped} skipped by FPS governor, "
+              f"{self.frame_slot.dropped} dropped before inference, {self.gaze_slot.dropped} dropped before decision, "
+              f"{self.roi.cropped_frames} on face crop / {self.roi.full_frames} full-frame")
+        if self.gate.enabled:
+            print(f"📊 Presence gate: {self.gate.gated_frames} landmarker runs skipped while away "
+                  f"({self.gate.cascade_runs} cascade checks)")
+
+        self.cap.release()
+        self.landmarker.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def calibrate_eye_tracker(session=None):
+    """
+    Calibration phase - returns calibration values
+
+    Args:
+        session: TrackerSession to calibrate on and leave running (optional;
+                 a temporary one is opened and closed otherwise)
+    """
     print("\n👁️  CALIBRATION MODE")
     print("Look at the CENTER of your screen and press 'C' to calibrate")
     print("Press 'Q' when done\n")
-    
-    landmarker = init_mediapipe()
-    cap = cv2.VideoCapture(VIDEO_CAPTURE)
-
-    history_h = deque(maxlen=10)
-    history_v = deque(maxlen=10)
-    
-    calibrated = False
-    center_h, center_v = 0.5, 0.45
-    frame_timestamp_ms = 0
 
-    while cap.isOpened():
-        success, image = cap.read()
-        if not success:
-            break
+    owns_session = session is None
+    if owns_session:
+        session = TrackerSession()
+    session.start()
+    session.set_target_fps(None)  # Every frame while the user is watching the window
 
-        image = cv2.flip(image, 1)
-        img_h, img_w, _ = image.shape
+    gaze_filter = make_filter(SMOOTHING, **SMOOTHING_PARAMS)
+    window = AlarmWindow('Calibration', mode=FULL)
+    h_ratio = v_ratio = None
 
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_image)
+    calibrated = False
+    center_h, center_v = 0.5, 0.45
 
-        results = landmarker.detect_for_video(mp_image, frame_timestamp_ms)
-        frame_timestamp_ms += 33
+    try:
+        while True:
+            sample = session.next_sample()
+            if sample is None:
+                if session.finished:
+                    break
+                continue
 
-        if results.face_landmarks:
-            landmarks = results.face_landmarks[0]
-            mesh_points = np.array([[int(lm.x * img_w), int(lm.y * img_h)] for lm in landmarks])
+            status = None
+            if sample.ratios is not None:
+                h_ratio, v_ratio = gaze_filter.update(sample.ratios[0], sample.ratios[1], sample.timestamp)
 
-            l_iris, r_iris = mesh_points[468], mesh_points[473]
-            l_inner, l_outer = mesh_points[133], mesh_points[33]
-            l_top, l_bottom = mesh_points[159], mesh_points[145]
-            r_inner, r_outer = mesh_points[362], mesh_points[263]
-            r_top, r_bottom = mesh_points[386], mesh_points[374]
+                if calibrated:
+                    status = ("CALIBRATED! Press Q to continue", (0, 255, 0), False)
+                else:
+                    status = ("STARE AT CENTER & PRESS 'C'", (0, 255, 255), False)
 
-            l_h_range = l_inner[0] - l_outer[0]
-            r_h_range = r_inner[0] - r_outer[0]
-            l_v_range = l_bottom[1] - l_top[1]
-            r_v_range = r_bottom[1] - r_top[1]
+            window.render(sample.image, status, time.monotonic())
 
-            if l_h_range != 0 and r_h_range != 0 and l_v_range != 0 and r_v_range != 0:
-                raw_h = ((l_iris[0] - l_outer[0]) / l_h_range +
-                        (r_iris[0] - r_outer[0]) / r_h_range) / 2
-                raw_v = ((l_iris[1] - l_top[1]) / l_v_range +
-                        (r_iris[1] - r_top[1]) / r_v_range) / 2
+            key = window.poll_key()
+            if key == ord('c'):
+                if sample.face_found and h_ratio is not None:
+                    center_h, center_v = h_ratio, v_ratio
+                    calibrated = True
+                    print(f"✅ Calibrated! Center: H={center_h:.3f}, V={center_v:.3f}")
 
-                history_h.append(raw_h)
-                history_v.append(raw_v)
-                h_ratio, v_ratio = sum(history_h) / len(history_h), sum(history_v) / len(history_v)
+                    # Save calibration
+                    save_calibration(session.camera_key, center_h, center_v)
 
+            elif key == ord('q'):
                 if calibrated:
-                    cv2.putText(image, "CALIBRATED! Press Q to continue", (30, 65), 
-                               cv2.FONT_HERSHEY_DUPLEX, 1.2, (0, 255, 0), 2)
+                    break
                 else:
-                    cv2.putText(image, "STARE AT CENTER & PRESS 'C'", (30, 65), 
-                               cv2.FONT_HERSHEY_DUPLEX, 1.2, (0, 255, 255), 2)
-
-        cv2.imshow('Calibration', image)
-
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('c'):
-            if results.face_landmarks and len(history_h) > 0:
-                center_h, center_v = h_ratio, v_ratio
-                calibrated = True
-                print(f"✅ Calibrated! Center: H={center_h:.3f}, V={center_v:.3f}")
-                
-                # Save calibration
-                with open('calibration.json', 'w') as f:
-                    json.dump({'center_h': center_h, 'center_v': center_v}, f)
-                
-        elif key == ord('q'):
-            if calibrated:
-                break
-            else:
-                print("⚠️  Please calibrate first by pressing 'C'")
+                    print("⚠️  Please calibrate first by pressing 'C'")
+    finally:
+        window.close()
+        session.set_target_fps(TARGET_FPS)
+        if owns_session:
+            session.close()
 
-    cap.release()
-    cv2.destroyAllWindows()
-    landmarker.close()
-    
     return center_h, center_v
 
 
-def run_eye_tracker_stream(center_h=0.5, center_v=0.45, metrics=None):
+def validate_calibration(session, center_h, center_v, duration=VALIDATION_SECONDS):
+    """
+    Check a saved calibration against a short automatic sample of the user's resting gaze.
+
+    Returns:
+        True if the median gaze over the sample sits within H_THRESHOLD/V_THRESHOLD of the center
+    """
+    session.start()
+    session.set_target_fps(None)
+    window = AlarmWindow('Calibration', mode=FULL)
+    status = ("CHECKING CALIBRATION - LOOK AT CENTER", (0, 255, 255), False)
+
+    samples_h, samples_v = [], []
+    deadline = time.monotonic() + duration
+    try:
+        while time.monotonic() < deadline:
+            sample = session.next_sample()
+            if sample is None:
+                if session.finished:
+                    break
+                continue
+            if sample.ratios is not None:
+                samples_h.append(sample.ratios[0])
+                samples_v.append(sample.ratios[1])
+            window.render(sample.image, status, time.monotonic())
+            window.poll_key()
+    finally:
+        window.close()
+        session.set_target_fps(TARGET_FPS)
+
+    if len(samples_h) < VALIDATION_MIN_SAMPLES:
+        print(f"⚠️  Calibration check saw a face in only {len(samples_h)} frames")
+        return False
+
+    h_diff = float(np.median(samples_h)) - center_h
+    v_diff = float(np.median(samples_v)) - center_v
+    print(f"🔎 Calibration check: H off by {h_diff:+.3f}, V off by {v_diff:+.3f}")
+    return abs(h_diff) < H_THRESHOLD and abs(v_diff) < V_THRESHOLD
+
+
+def calibrate_multipoint(session):
+    """
+    Multi-point calibration - the user follows a dot through the corners, edges
+    and center of the screen, and a gaze-to-screen mapping is fitted to the result.
+
+    Returns:
+        (center_h, center_v, mapping), or None if too few points could be sampled
+    """
+    print("\n👁️  MULTI-POINT CALIBRATION")
+    print(f"Follow the dot with your eyes across {len(CALIBRATION_TARGETS)} points. Press 'Q' to cancel\n")
+
+    session.start()
+    session.set_target_fps(None)
+
+    title = 'FlowState Calibration'
+    canvas_w, canvas_h = MULTIPOINT_CANVAS
+    canvas = np.zeros((canvas_h, canvas_w, 3), dtype=np.uint8)
+    cv2.namedWindow(title, cv2.WINDOW_NORMAL)
+    cv2.setWindowProperty(title, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    points_h, points_v, targets = [], [], []
+    try:
+        for tx, ty in CALIBRATION_TARGETS:
+            canvas[:] = 0
+            cv2.circle(canvas, (int(tx * canvas_w), int(ty * canvas_h)), 18, (0, 255, 255), -1)
+            cv2.circle(canvas, (int(tx * canvas_w), int(ty * canvas_h)), 4, (0, 0, 0), -1)
+            cv2.imshow(title, canvas)
+
+            collect_from = time.monotonic() + MULTIPOINT_SETTLE_SECONDS
+            collect_until = collect_from + MULTIPOINT_COLLECT_SECONDS
+            samples_h, samples_v = [], []
+            while time.monotonic() < collect_until:
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    print("⚠️  Multi-point calibration cancelled")
+                    return None
+                sample = session.next_sample(timeout=0.02)
+                if sample is None:
+                    if session.finished:
+                        return None
+                    continue
+                if sample.ratios is not None and sample.timestamp >= collect_from:
+                    samples_h.append(sample.ratios[0])
+                    samples_v.append(sample.ratios[1])
+
+            if len(samples_h) < 3:
+                print(f"⚠️  No steady gaze at point ({tx:.2f}, {ty:.2f}) - skipping it")
+                continue
+            points_h.append(float(np.median(samples_h)))
+            points_v.append(float(np.median(samples_v)))
+            targets.append((tx, ty))
+    finally:
+        cv2.destroyWindow(title)
+        session.set_target_fps(TARGET_FPS)
+
+    if len(targets) < len(TERMS):
+        print(f"⚠️  Only {len(targets)} usable points - need {len(TERMS)}")
+        return None
+
+    targets = np.asarray(targets)
+    mapping = fit_gaze_mapping(points_h, points_v, targets[:, 0], targets[:, 1])
+
+    # The center dot doubles as the resting-gaze reference used to validate the calibration later
+    center_idx = int(np.argmin(np.abs(targets - 0.5).sum(axis=1)))
+    center_h, center_v = points_h[center_idx], points_v[center_idx]
+
+    print(f"✅ Calibrated {len(targets)} points (fit error {mapping.rms_error:.3f} screens). "
+          f"Center: H={center_h:.3f}, V={center_v:.3f}")
+    save_calibration(session.camera_key, center_h, center_v, mapping=mapping.to_dict())
+    return center_h, center_v, mapping
+
+
+def load_or_calibrate(session, mode=CALIBRATION_MODE):
+    """
+    Reuse this camera's saved calibration if the user's resting gaze still matches it,
+    otherwise fall back to interactive calibration.
+
+    Args:
+        mode: "multipoint" or "center" - the kind of calibration to run if one is needed
+
+    Returns:
+        (center_h, center_v, mapping) where mapping is a GazeMapping or None for a center-only calibration
+    """
+    key = session.camera_key
+    stored = load_calibration(key)
+    saved_mapping = load_mapping(key)
+    mapping = GazeMapping.from_dict(saved_mapping) if saved_mapping else None
+    if stored is not None and (mapping is not None or mode != "multipoint"):
+        print("\n👁️  Found a saved calibration - look at the CENTER of your screen for a moment...")
+        if validate_calibration(session, *stored):
+            print(f"✅ Saved calibration still fits: H={stored[0]:.3f}, V={stored[1]:.3f}")
+            return stored[0], stored[1], mapping if mode == "multipoint" else None
+        print("⚠️  Saved calibration doesn't match - recalibrating")
+
+    if mode == "multipoint":
+        result = calibrate_multipoint(session)
+        if result is not None:
+            return result
+        print("↩️  Falling back to center calibration")
+
+    center_h, center_v = calibrate_eye_tracker(session)
+    return center_h, center_v, None
+
+
+def apply_config(config, decider, session, scheduler=None):
+    """Swap a new TrackerConfig into a running stream (called between frames)"""
+    decider.h_threshold = config.h_threshold
+    decider.v_threshold = config.v_threshold
+    decider.tracker.min_look_away = config.min_look_away
+    decider.tracker.alarm_duration = config.alarm_duration
+    session.set_target_fps(config.target_fps)
+    if scheduler is not None:
+        scheduler.base_fps = config.target_fps
+        scheduler.min_look_away = config.min_look_away
+        scheduler.current_fps = config.target_fps
+    print(f"🔄 Config reloaded: look away after {config.min_look_away}s, alarm after {config.alarm_duration}s, "
+          f"thresholds H={config.h_threshold} V={config.v_threshold}, target {config.target_fps} fps")
+
+
+def run_eye_tracker_stream(center_h=0.5, center_v=0.45, metrics=None, target_fps=None,
+                           display=DISPLAY_MODE, session=None, events=None, mapping=None,
+                           adaptive=ADAPTIVE_RATE, record_log=RECORD_GAZE_LOG):
     """
     Streaming phase - runs continuously with calibration values
-    
+
+    Capture and inference run on background threads (see pipeline.py); this
+    thread only makes the look-away decision and renders the alarm window.
+    In headless mode there is no window at all; stop the stream with Ctrl+C.
+
+    Look-away, alarm and face lost/found events are published to an EventBus
+    and handled on its dispatcher thread, never inside the frame loop.
+
+    Thresholds and target FPS come from config.json and are re-applied between
+    frames whenever the file changes (checked every CONFIG_POLL_SECONDS).
+
+    With adaptive sampling the landmarker rate drops during long steady
+    on-screen stretches (see adaptive_rate.py) and returns to target_fps as
+    soon as the gaze drifts toward the limit or the face is lost.
+
+    Per-stage timings (see stage_profiler.py) are printed on SIGUSR1 or the
+    'p' key, and printed and saved to stage_profile.json when the stream ends.
+    A time-weighted heatmap of the smoothed gaze (see gaze_heatmap.py) is
+    saved to session_data/ at the end. With record_log every analyzed frame
+    is also written to a .gazelog file there.
+
     Args:
         center_h: Calibrated horizontal center value
         center_v: Calibrated vertical center value
-        metrics: SessionMetrics object for tracking analytics (optional)
+        metrics: SessionMetrics object for tracking analytics (optional; subscribed to
+                 a private EventBus when events is not given)
+        target_fps: Max landmarker runs per second; extra camera frames are skipped
+                    (defaults to config.json; a later config change overrides it)
+        display: HEADLESS, PREVIEW (downscaled, PREVIEW_FPS) or FULL alarm window
+        session: TrackerSession to stream from, e.g. the one used for calibration
+                 (optional; a temporary one is opened and closed otherwise)
+        events: EventBus to publish gaze events to (optional; the caller starts and stops it)
+        mapping: GazeMapping from multi-point calibration; replaces the H/V threshold box (optional)
+        adaptive: Use adaptive sampling
+        record_log: Record the per-frame gaze signal (see gaze_log.py)
+
+    Returns:
+        Dict of stream stats (duration, landmarker runs, average fps, CPU time, estimated saving,
+        per-stage timings, gaze heatmap summary, gaze log path)
     """
     print("\n👁️  Eye tracker streaming started")
-    
-    landmarker = init_mediapipe()
-    cap = cv2.VideoCapture(VIDEO_CAPTURE)
-
-    history_h = deque(maxlen=10)
-    history_v = deque(maxlen=10)
-
-    off_screen_start_time = None
-    alarm_triggered = False
-    frame_timestamp_ms = 0
-    
-    # Track previous state to detect transitions
-    was_looking_away = False
-    look_away_tracked = False  # Flag to ensure we only track once per look away event
-
-    while cap.isOpened():
-        success, image = cap.read()
-        if not success:
-            break
-
-        image = cv2.flip(image, 1)
-        img_h, img_w, _ = image.shape
-
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_image)
-
-        results = landmarker.detect_for_video(mp_image, frame_timestamp_ms)
-        frame_timestamp_ms += 33
-
-        status_color = (0, 255, 255)
-        txt = "TRACKING..."
-        show_text = True
-
-        if results.face_landmarks:
-            landmarks = results.face_landmarks[0]
-            mesh_points = np.array([[int(lm.x * img_w), int(lm.y * img_h)] for lm in landmarks])
-
-            l_iris, r_iris = mesh_points[468], mesh_points[473]
-            l_inner, l_outer = mesh_points[133], mesh_points[33]
-            l_top, l_bottom = mesh_points[159], mesh_points[145]
-            r_inner, r_outer = mesh_points[362], mesh_points[263]
-            r_top, r_bottom = mesh_points[386], mesh_points[374]
-
-            l_h_range = l_inner[0] - l_outer[0]
-            r_h_range = r_inner[0] - r_outer[0]
-            l_v_range = l_bottom[1] - l_top[1]
-            r_v_range = r_bottom[1] - r_top[1]
-
-            if l_h_range != 0 and r_h_range != 0 and l_v_range != 0 and r_v_range != 0:
-                raw_h = ((l_iris[0] - l_outer[0]) / l_h_range +
-                        (r_iris[0] - r_outer[0]) / r_h_range) / 2
-                raw_v = ((l_iris[1] - l_top[1]) / l_v_range +
-                        (r_iris[1] - r_top[1]) / r_v_range) / 2
-
-                history_h.append(raw_h)
-                history_v.append(raw_v)
-                h_ratio, v_ratio = sum(history_h) / len(history_h), sum(history_v) / len(history_v)
-
-                h_diff, v_diff = h_ratio - center_h, v_ratio - center_v
-                on_screen = (abs(h_diff) < H_THRESHOLD) and (abs(v_diff) < V_THRESHOLD)
-
-                if not on_screen:
-                    # User is looking away
-                    if off_screen_start_time is None:
-                        off_screen_start_time = time.time()
-                        was_looking_away = True
-
-                    elapsed = time.time() - off_screen_start_time
-                    
-                    # Only start tracking after minimum duration threshold
-                    if elapsed >= MIN_LOOK_AWAY_DURATION and not look_away_tracked:
-                        if metrics:
-                            metrics.start_look_away()
-                        look_away_tracked = True
-
-                    if elapsed > ALARM_DURATION:
-                        alarm_triggered = True
-                        status_color = (0, 0, 255)
-                        txt = f"ALARM: RETURN TO SCREEN ({int(elapsed)}s)"
-                        if int(time.time() * 2) % 2 == 0:
-                            show_text = False
-                    else:
-                        status_color = (0, 165, 255)
-                        txt = f"AWAY: {int(elapsed)}s"
-                else:
-                    # User is back on screen
-                    if was_looking_away and look_away_tracked:
-                        # Only track end if we started tracking (i.e., it was long enough)
-                        if metrics:
-                            metrics.end_look_away()
-                    
-                    # Reset all flags
-                    off_screen_start_time, alarm_triggered = None, False
-                    was_looking_away = False
-                    look_away_tracked = False
-                    status_color, txt = (0, 255, 0), "ON SCREEN"
-
-                if alarm_triggered:
-                    cv2.rectangle(image, (0, 0), (img_w, img_h), (0, 0, 255), 25)
-
-                if show_text:
-                    cv2.putText(image, txt, (30, 65), cv2.FONT_HERSHEY_DUPLEX, 1.2, status_color, 2)
-
-        cv2.imshow('FlowState Visual Alarm', image)
-
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            # If user was looking away when quitting and it was tracked, end that event
-            if was_looking_away and look_away_tracked and metrics:
-                metrics.end_look_away()
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
-    landmarker.close()
+
+    owns_events = events is None
+    if owns_events:
+        events = EventBus()
+        if metrics:
+            events.subscribe(forward_to_metrics(metrics))
+        events.start()
+
+    owns_session = session is None
+    if owns_session:
+        session = TrackerSession()
+    config_watcher = ConfigWatcher(DEFAULT_CONFIG, poll_interval=CONFIG_POLL_SECONDS)
+    config = load_config()
+    if target_fps is not None:
+        config = config._replace(target_fps=target_fps)
+
+    session.start()
+    session.set_target_fps(config.target_fps)
+
+    decider = GazeDecider(center_h, center_v, config.h_threshold, config.v_threshold,
+                          config.min_look_away, config.alarm_duration,
+                          gaze_filter=make_filter(SMOOTHING, **SMOOTHING_PARAMS), mapping=mapping)
+    presence = FacePresenceTracker()
+    heatmap = GazeHeatmap(center_h, center_v)
+    recorder = None
+    if record_log:
+        recorder = GazeLogRecorder(meta={
+            "center_h": center_h, "center_v": center_v, "config": config._asdict(),
+            "smoothing": SMOOTHING, "smoothing_params": SMOOTHING_PARAMS,
+            "mapping": mapping.to_dict() if mapping else None,
+        })
+    window = AlarmWindow('FlowState Visual Alarm', mode=display, max_fps=PREVIEW_FPS, width=PREVIEW_WIDTH)
+    scheduler = None
+    if adaptive:
+        scheduler = AdaptiveRateScheduler(config.target_fps, config.min_look_away, min_fps=ADAPTIVE_MIN_FPS,
+                                          stable_after=ADAPTIVE_STABLE_SECONDS,
+                                          max_delay_fraction=ADAPTIVE_MAX_DELAY_FRACTION)
+    profiler = session.profiler
+    profiler.install_signal_handler()
+    last_timestamp = time.monotonic()
+    stream_start, cpu_start = time.monotonic(), time.process_time()
+    inferred_start = session.gaze_slot.put_count
+
+    try:
+        while True:
+            new_config = config_watcher.poll(time.monotonic())
+            if new_config is not None and new_config != config:
+                config = new_config
+                apply_config(config, decider, session, scheduler)
+
+            sample = session.next_sample()
+            if sample is None:
+                if session.finished:
+                    break
+                continue
+            last_timestamp = sample.timestamp
+            decision_start = time.perf_counter()
+
+            face_event = presence.update(sample.face_found, sample.timestamp)
+            if face_event:
+                events.publish(face_event, sample.timestamp)
+
+            alarm_was_on = decider.tracker.alarm_triggered
+            on_screen, event = decider.update(sample.ratios, sample.timestamp)
+            if on_screen is None:
+                heatmap.skip()
+            else:
+                heatmap.add(decider.smoothed[0], decider.smoothed[1], sample.timestamp)
+            if recorder is not None:
+                recorder.append(sample.timestamp, sample.ratios, decider.smoothed, sample.face_found, on_screen)
+            if event:
+                events.publish(event, sample.timestamp, elapsed=round(decider.tracker.elapsed, 2))
+            if decider.tracker.alarm_triggered and not alarm_was_on:
+                events.publish(ALARM_STARTED, sample.timestamp, elapsed=round(decider.tracker.elapsed, 2))
+
+            if scheduler is not None:
+                fps = scheduler.current_fps
+                if scheduler.update(sample.face_found, on_screen, decider.edge_ratio, sample.timestamp) != fps:
+                    session.set_target_fps(scheduler.current_fps)
+
+            status = None
+            if on_screen is not None and window.enabled:
+                status = describe_status(decider.tracker, on_screen)
+            profiler.record("decision", time.perf_counter() - decision_start)
+
+            now = time.monotonic()
+            if window.due(now):
+                render_start = time.perf_counter()
+                window.render(sample.image, status, now)
+                key = window.poll_key()
+                profiler.record("render", time.perf_counter() - render_start)
+                if key == ord('q'):
+                    break
+                if key == ord('p'):
+                    profiler.print_summary()
+    finally:
+        # If user was looking away when quitting and it was tracked, end that event
+        if decider.tracker.finish() == LOOK_AWAY_ENDED:
+            events.publish(LOOK_AWAY_ENDED, last_timestamp)
+        if owns_events:
+            events.stop()
+
+        duration = time.monotonic() - stream_start
+        inferences = session.gaze_slot.put_count - inferred_start
+        average_fps = inferences / duration if duration > 0 else 0.0
+        cpu_seconds = time.process_time() - cpu_start
+        stats = {
+            "duration_seconds": duration,
+            "landmarker_runs": inferences,
+            "average_fps": average_fps,
+            "target_fps": config.target_fps,
+            "cpu_seconds": cpu_seconds,
+            "cpu_percent": 100 * cpu_seconds / duration if duration > 0 else 0.0,
+            # Inference dominates tracker CPU, so skipped runs are roughly CPU saved
+            "estimated_runs_saved_percent": (max(0.0, 100 * (1 - average_fps / config.target_fps))
+                                             if config.target_fps else None),
+            "stage_timings": profiler.summary(),
+            # The threshold box only applies without a multi-point mapping
+            "heatmap": (heatmap.summary() if mapping else
+                        heatmap.summary(config.h_threshold, config.v_threshold)),
+        }
+        saved = stats["estimated_runs_saved_percent"]
+        print(f"📊 Gaze sampling: {average_fps:.1f} fps average over {duration:.0f}s "
+              f"(target {config.target_fps})" + (f", ~{saved:.0f}% fewer landmarker runs" if saved is not None else ""))
+        print(f"📊 Process CPU while streaming: {cpu_seconds:.1f}s ({stats['cpu_percent']:.0f}% of one core)")
+        print(f"📊 Alarm window: {window.frames_rendered} frames rendered")
+        profiler.print_summary()
+        try:
+            profiler.save()
+        except OSError as e:
+            print(f"⚠️  Could not save stage timings: {e}")
+        stats["heatmap"]["ascii"] = heatmap.ascii()
+        try:
+            stats["heatmap"]["file"] = heatmap.save()
+        except OSError as e:
+            stats["heatmap"]["file"] = None
+            print(f"⚠️  Could not save gaze heatmap: {e}")
+        stats["gaze_log"] = None
+        if recorder is not None:
+            stats["gaze_log"] = recorder.close()
+            print(f"📊 Gaze log: {recorder.rows} samples -> {stats['gaze_log']}")
+        window.close()
+        if owns_session:
+            session.close()
+
+    return stats
 
 
 if __name__ == "__main__":
-    center_h, center_v = calibrate_eye_tracker()
-    run_eye_tracker_stream(center_h, center_v)
\ No newline at end of file
+    # From backend/: python -m eye_tracking.eye_tracker
+    with TrackerSession() as session:
+        center_h, center_v, mapping = load_or_calibrate(session)
+        run_eye_tracker_stream(center_h, center_v, session=session, mapping=mapping)
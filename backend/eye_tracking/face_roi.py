@@ -0,0 +1,115 @@
+"""
+Face ROI Tracking
+Keeps a padded box around the face found in the previous frame so the
+landmarker only has to look at (and we only have to flip/convert) that crop.
+Falls back to the full frame whenever the face is lost.
+"""
+
+import cv2
+import numpy as np
+
+# Forehead, chin and both cheeks - enough to bound the face
+FACE_OUTLINE = (10, 152, 234, 454)
+
+MIN_ROI_SIZE = 64  # px - anything smaller is treated as a lost face
+
+
+class FaceRoiTracker:
+    """
+    Crops camera frames to the region around the last known face.
+
+    Boxes are in mirrored (flipped) full-frame pixels, the same coordinate
+    system the gaze features are computed in.
+    """
+    def __init__(self, padding=0.5, max_input_size=256, enabled=True):
+        """
+        Args:
+            padding: Margin added on every side, as a fraction of the face size
+            max_input_size: Crops larger than this (longest side, px) are downscaled; None keeps full size
+            enabled: When False every frame is passed through whole
+        """
+        self.padding = padding
+        self.max_input_size = max_input_size
+        self.enabled = enabled
+        self.box = None  # (x0, y0, x1, y1) or None while searching the full frame
+        self._outline = np.zeros((len(FACE_OUTLINE), 2), dtype=np.float64)
+        self.cropped_frames = 0
+        self.full_frames = 0
+
+    def mirror(self, raw_image):
+        """
+        Crop, downscale and flip a raw (unmirrored) BGR camera frame for the landmarker.
+
+        Returns:
+            (bgr_image, region) where region is (x0, y0, w, h) of the mirrored
+            full frame that bgr_image covers
+        """
+        img_h, img_w = raw_image.shape[:2]
+
+        if self.box is None:
+            self.full_frames += 1
+            return cv2.flip(raw_image, 1), (0, 0, img_w, img_h)
+
+        self.cropped_frames += 1
+        x0, y0, x1, y1 = self.box
+        w, h = x1 - x0, y1 - y0
+        # Mirrored x0..x1 is raw img_w-x1..img_w-x0, so crop before flipping
+        crop = raw_image[y0:y1, img_w - x1:img_w - x0]
+
+        if self.max_input_size and max(w, h) > self.max_input_size:
+            scale = self.max_input_size / max(w, h)
+            crop = cv2.resize(crop, (max(1, round(w * scale)), max(1, round(h * scale))),
+                              interpolation=cv2.INTER_AREA)
+
+        return cv2.flip(crop, 1), (x0, y0, w, h)
+
+    def update(self, landmarks, region, frame_shape):
+        """
+        Re-center the box on this frame's face.
+
+        Args:
+            landmarks: Face landmarks from the landmarker, or None if no face was found
+            region: The region returned by mirror() for this frame
+            frame_shape: Shape of the full camera frame
+        """
+        if landmarks is None or not self.enabled:
+            self.box = None
+            return
+
+        x0, y0, w, h = region
+        pts = self._outline
+        for row, idx in enumerate(FACE_OUTLINE):
+            lm = landmarks[idx]
+            pts[row, 0] = lm.x
+            pts[row, 1] = lm.y
+        pts[:, 0] = pts[:, 0] * w + x0
+        pts[:, 1] = pts[:, 1] * h + y0
+
+        fx0, fy0 = pts.min(axis=0)
+        fx1, fy1 = pts.max(axis=0)
+        face_size = max(fx1 - fx0, fy1 - fy0)
+        if face_size <= 0:
+            self.box = None
+            return
+
+        # Keep the current box while the face sits comfortably inside it - a
+        # steady crop is cheaper to track for the landmarker than a jittery one
+        if self.box is not None:
+            bx0, by0, bx1, by1 = self.box
+            margin = face_size * self.padding / 2
+            box_size = max(bx1 - bx0, by1 - by0)
+            expected_size = face_size * (1 + 2 * self.padding)
+            if (fx0 - bx0 >= margin and fy0 - by0 >= margin and
+                    bx1 - fx1 >= margin and by1 - fy1 >= margin and
+                    0.8 * expected_size <= box_size <= 1.25 * expected_size):
+                return
+
+        img_h, img_w = frame_shape[:2]
+        pad = face_size * self.padding
+        box = (max(0, int(fx0 - pad)), max(0, int(fy0 - pad)),
+               min(img_w, int(fx1 + pad) + 1), min(img_h, int(fy1 + pad) + 1))
+
+        if box[2] - box[0] < MIN_ROI_SIZE or box[3] - box[1] < MIN_ROI_SIZE:
+            self.box = None
+        else:
+            self.box = box
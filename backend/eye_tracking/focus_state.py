@@ -0,0 +1,139 @@
+"""
+Look-Away State Machine
+Turns a stream of gaze ratios into on-screen / off-screen decisions and
+look-away events.
+"""
+
+from eye_tracking.gaze_filters import MovingAverageFilter
+
+LOOK_AWAY_STARTED = "look_away_started"
+LOOK_AWAY_ENDED = "look_away_ended"
+ALARM_STARTED = "alarm_started"
+FACE_LOST = "face_lost"
+FACE_FOUND = "face_found"
+
+
+class LookAwayTracker:
+    """
+    Tracks how long the user has been looking away.
+
+    A look away is only reported once it has lasted min_look_away seconds,
+    and the alarm fires once it has lasted longer than alarm_duration.
+    """
+    def __init__(self, min_look_away, alarm_duration):
+        self.min_look_away = min_look_away
+        self.alarm_duration = alarm_duration
+        self.off_screen_start_time = None
+        self.elapsed = 0.0
+        self.alarm_triggered = False
+        self.look_away_tracked = False  # Flag to ensure we only track once per look away event
+
+    @property
+    def looking_away(self):
+        return self.off_screen_start_time is not None
+
+    def update(self, on_screen, now):
+        """
+        Feed one decision.
+
+        Returns:
+            LOOK_AWAY_STARTED, LOOK_AWAY_ENDED or None
+        """
+        if not on_screen:
+            # User is looking away
+            if self.off_screen_start_time is None:
+                self.off_screen_start_time = now
+
+            self.elapsed = now - self.off_screen_start_time
+            self.alarm_triggered = self.elapsed > self.alarm_duration
+
+            # Only start tracking after minimum duration threshold
+            if self.elapsed >= self.min_look_away and not self.look_away_tracked:
+                self.look_away_tracked = True
+                return LOOK_AWAY_STARTED
+            return None
+
+        # User is back on screen - only report an end if we reported the start
+        event = LOOK_AWAY_ENDED if self.look_away_tracked else None
+        self.off_screen_start_time = None
+        self.elapsed = 0.0
+        self.alarm_triggered = False
+        self.look_away_tracked = False
+        return event
+
+    def finish(self):
+        """Close out a tracked look away at shutdown. Returns LOOK_AWAY_ENDED or None"""
+        event = LOOK_AWAY_ENDED if self.look_away_tracked else None
+        self.look_away_tracked = False
+        return event
+
+
+class GazeDecider:
+    """
+    Smooths raw gaze ratios, decides whether they are on screen and feeds the look-away tracker.
+
+    With a multi-point GazeMapping the smoothed ratios are mapped to a screen
+    point and tested against the screen bounds; otherwise they are tested
+    against the H/V threshold box around the calibrated center.
+    """
+    def __init__(self, center_h, center_v, h_threshold, v_threshold, min_look_away, alarm_duration,
+                 gaze_filter=None, mapping=None):
+        self.center_h = center_h
+        self.center_v = center_v
+        self.h_threshold = h_threshold
+        self.v_threshold = v_threshold
+        self.gaze_filter = gaze_filter or MovingAverageFilter()
+        self.mapping = mapping
+        self.tracker = LookAwayTracker(min_look_away, alarm_duration)
+        self.smoothed = None  # Latest smoothed (h, v)
+        self.gaze_point = None  # Latest estimated (x, y) screen point, when a mapping is set
+        self.edge_ratio = None  # How close the gaze is to the on-screen limit: 0 = center, 1 = on the limit
+
+    def update(self, ratios, timestamp):
+        """
+        Feed one frame's (raw_h, raw_v), or None when no usable face was found.
+
+        Returns:
+            (on_screen, event) - on_screen is None when there was nothing to decide on
+        """
+        if ratios is None:
+            return None, None
+
+        h_ratio, v_ratio = self.gaze_filter.update(ratios[0], ratios[1], timestamp)
+        self.smoothed = (h_ratio, v_ratio)
+
+        if self.mapping is not None:
+            x, y = self.mapping.map(h_ratio, v_ratio)
+            self.gaze_point = (x, y)
+            on_screen = self.mapping.contains(x, y)
+            self.edge_ratio = max(abs(x - 0.5), abs(y - 0.5)) / (0.5 + self.mapping.margin)
+        else:
+            h_diff, v_diff = h_ratio - self.center_h, v_ratio - self.center_v
+            on_screen = (abs(h_diff) < self.h_threshold) and (abs(v_diff) < self.v_threshold)
+            self.edge_ratio = max(abs(h_diff) / self.h_threshold, abs(v_diff) / self.v_threshold)
+
+        return on_screen, self.tracker.update(on_screen, timestamp)
+
+
+class FacePresenceTracker:
+    """Reports FACE_LOST once no face has been seen for lost_after seconds, and FACE_FOUND when it returns"""
+    def __init__(self, lost_after=1.0):
+        self.lost_after = lost_after
+        self.present = True
+        self._last_seen = None
+
+    def update(self, face_found, timestamp):
+        """Returns FACE_LOST, FACE_FOUND or None"""
+        if face_found:
+            self._last_seen = timestamp
+            if not self.present:
+                self.present = True
+                return FACE_FOUND
+            return None
+
+        if self._last_seen is None:
+            self._last_seen = timestamp
+        if self.present and timestamp - self._last_seen >= self.lost_after:
+            self.present = False
+            return FACE_LOST
+        return None
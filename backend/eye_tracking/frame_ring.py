@@ -0,0 +1,314 @@
+"""
+Shared-Memory Frame Ring
+Hands camera frames from a capture process to an inference process without
+pickling them. The writer copies each BGR frame once into one of a fixed
+number of shared slots; readers get NumPy views straight into the slot.
+
+Slots are overwritten oldest-first, the same "keep the newest" behavior as
+pipeline.LatestSlot. A frame handed to a reader stays intact until the
+writer has published slots - 1 more frames; a reader that holds on longer
+can check is_current(frame.seq) before trusting the pixels.
+
+Benchmark against multiprocessing.Queue (from backend/; producers run at
+30 fps by default, --fps 0 for unpaced):
+    python -m eye_tracking.frame_ring
+"""
+
+import argparse
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_SLOTS = 4
+
+# Header fields (int64): newest published sequence number, closed flag, frame geometry
+_WRITE_SEQ, _CLOSED, _SLOTS, _HEIGHT, _WIDTH, _CHANNELS = range(6)
+_HEADER_FIELDS = 8  # Rounded up so the slot arrays stay 64-byte aligned
+
+# A frame read from the ring. Same fields as pipeline.Frame plus the ring sequence number;
+# image is a view into shared memory
+RingFrame = namedtuple("RingFrame", ["seq", "frame_id", "timestamp", "image"])
+
+
+def _ring_size(slots, height, width, channels):
+    return 8 * _HEADER_FIELDS + 8 * 3 * slots + slots * height * width * channels
+
+
+class SharedFrameRing:
+    """
+    Fixed-size frame slots in one shared memory block.
+
+    Create it in the process that owns the camera (create=True with the frame
+    geometry), then attach from other processes by name.
+    """
+    def __init__(self, name=None, create=False, shape=None, slots=DEFAULT_SLOTS):
+        """
+        Args:
+            name: Shared memory block name (None picks one; pass .name to other processes)
+            create: Allocate the block instead of attaching to an existing one
+            shape: (height, width, channels) of every frame, required when creating
+            slots: Number of frame slots, when creating
+        """
+        if create:
+            height, width, channels = shape
+            self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                                  size=_ring_size(slots, height, width, channels))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.owner = create
+
+        buf = self.shm.buf
+        self.header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=buf)
+        if create:
+            self.header[:] = 0
+            self.header[_HEIGHT], self.header[_WIDTH], self.header[_CHANNELS] = height, width, channels
+            self.header[_SLOTS] = slots  # Last: attachers treat a non-zero slot count as "geometry ready"
+
+        self.slots = int(self.header[_SLOTS])
+        self.shape = (int(self.header[_HEIGHT]), int(self.header[_WIDTH]), int(self.header[_CHANNELS]))
+        offset = 8 * _HEADER_FIELDS
+        self.slot_seq = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * self.slots
+        self.slot_frame_id = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * self.slots
+        self.slot_timestamp = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=offset)
+        offset += 8 * self.slots
+        self.data = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=buf, offset=offset)
+        if create:
+            self.slot_seq[:] = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def write_seq(self):
+        """Sequence number of the newest published frame (0 = none yet)"""
+        return int(self.header[_WRITE_SEQ])
+
+    @property
+    def closed(self):
+        return bool(self.header[_CLOSED])
+
+    # ========================
+    # WRITER SIDE
+    # ========================
+
+    def write(self, image, frame_id, timestamp):
+        """Copy a frame into the oldest slot and publish it. Returns its sequence number"""
+        if image.shape != self.shape:
+            raise ValueError(f"Frame shape {image.shape} does not match ring shape {self.shape}")
+        seq = self.write_seq + 1
+        i = seq % self.slots
+        self.slot_seq[i] = -1  # Mark the slot as being rewritten before touching the pixels
+        np.copyto(self.data[i], image)
+        self.slot_frame_id[i] = frame_id
+        self.slot_timestamp[i] = timestamp
+        self.slot_seq[i] = seq
+        self.header[_WRITE_SEQ] = seq
+        return seq
+
+    def close(self):
+        """Mark the writer as finished so readers stop waiting"""
+        self.header[_CLOSED] = 1
+
+    # ========================
+    # READER SIDE
+    # ========================
+
+    def read(self, seq):
+        """RingFrame for seq as a zero-copy view, or None if that slot has been overwritten"""
+        i = seq % self.slots
+        if self.slot_seq[i] != seq:
+            return None
+        frame = RingFrame(seq, int(self.slot_frame_id[i]), float(self.slot_timestamp[i]), self.data[i])
+        return frame if self.slot_seq[i] == seq else None
+
+    def is_current(self, seq):
+        """True while the slot holding seq has not been reused"""
+        return self.slot_seq[seq % self.slots] == seq
+
+    def release(self):
+        """Detach from the shared memory (and free it, in the creating process)"""
+        # Drop our views first; SharedMemory.close() fails while they are alive
+        self.header = self.slot_seq = self.slot_frame_id = self.slot_timestamp = self.data = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # A caller still holds a frame view; the mapping goes away with the process
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingReader:
+    """
+    Consumer cursor over a SharedFrameRing with the LatestSlot interface
+    (get(timeout), closed, dropped), so it can stand in for one in a worker.
+    """
+    def __init__(self, ring, poll_interval=0.001):
+        self.ring = ring
+        self.poll_interval = poll_interval
+        self.last_seq = 0
+        self.dropped = 0
+
+    @property
+    def closed(self):
+        return self.ring.closed
+
+    @property
+    def put_count(self):
+        return self.ring.write_seq
+
+    def get(self, timeout=None):
+        """Newest unread frame, or None on timeout or once the writer has closed and nothing is new"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            seq = self.ring.write_seq
+            if seq > self.last_seq:
+                frame = self.ring.read(seq)
+                if frame is not None:
+                    self.dropped += seq - self.last_seq - 1
+                    self.last_seq = seq
+                    return frame
+                continue  # Overwritten between reading write_seq and the slot; try the newer one
+            if self.ring.closed or (deadline is not None and time.monotonic() >= deadline):
+                return None
+            time.sleep(self.poll_interval)
+
+
+# ========================
+# BENCHMARK
+# ========================
+
+BENCH_RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+BENCH_FPS = 30  # Camera-like producer rate; 0 sends as fast as possible
+
+
+def _bench_frames(shape, count):
+    frames = [np.random.randint(0, 256, shape, dtype=np.uint8) for _ in range(2)]
+    for i in range(count):
+        yield frames[i % 2]
+
+
+def _queue_producer(q, shape, count, fps):
+    interval = 1.0 / fps if fps else 0.0
+    for i, image in enumerate(_bench_frames(shape, count)):
+        q.put((i, time.monotonic(), image))
+        if interval:
+            time.sleep(interval)
+    q.put(None)
+
+
+def _ring_producer(name, shape, count, fps):
+    ring = SharedFrameRing(name)
+    interval = 1.0 / fps if fps else 0.0
+    for i, image in enumerate(_bench_frames(shape, count)):
+        ring.write(image, i, time.monotonic())
+        if interval:
+            time.sleep(interval)
+    ring.close()
+    ring.release()
+
+
+def _consume(get):
+    """Drain frames from get() until None. Returns the per-frame latencies in ms"""
+    latencies = []
+    while True:
+        item = get()
+        if item is None:
+            break
+        timestamp, image = item
+        _ = image[0, 0, 0]  # Touch the pixels like a consumer would
+        latencies.append(1000 * (time.monotonic() - timestamp))
+    return latencies
+
+
+def _result(transport, width, height, count, latencies):
+    return {
+        "transport": transport,
+        "resolution": f"{width}x{height}",
+        "sent": count,
+        "delivered": len(latencies),
+        "dropped": count - len(latencies),
+        "latency_ms": float(np.mean(latencies)) if latencies else 0.0,
+        "latency_p95_ms": float(np.percentile(latencies, 95)) if latencies else 0.0,
+    }
+
+
+def benchmark(resolutions=BENCH_RESOLUTIONS, count=300, fps=BENCH_FPS):
+    """
+    Send count frames per resolution from a producer process to this one,
+    via multiprocessing.Queue and via SharedFrameRing.
+
+    The queue delivers every frame (the producer blocks when it is full);
+    the ring drops frames the reader didn't get to before they were
+    overwritten, so delivered and dropped counts are reported separately.
+    Latency is capture timestamp to consumer, per delivered frame.
+
+    Args:
+        fps: Producer rate (0 = as fast as possible, which mostly measures
+             the queue's backlog rather than transfer cost)
+
+    Returns:
+        List of result dicts
+    """
+    import multiprocessing
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for width, height in resolutions:
+        shape = (height, width, 3)
+
+        q = ctx.Queue(maxsize=DEFAULT_SLOTS)
+        producer = ctx.Process(target=_queue_producer, args=(q, shape, count, fps))
+        producer.start()
+
+        def queue_get():
+            item = q.get()
+            return None if item is None else item[1:]
+
+        latencies = _consume(queue_get)
+        producer.join()
+        results.append(_result("queue", width, height, count, latencies))
+
+        ring = SharedFrameRing(create=True, shape=shape)
+        reader = RingReader(ring, poll_interval=0.0005)
+        producer = ctx.Process(target=_ring_producer, args=(ring.name, shape, count, fps))
+        producer.start()
+
+        def ring_get():
+            frame = reader.get()
+            return None if frame is None else (frame.timestamp, frame.image)
+
+        latencies = _consume(ring_get)
+        producer.join()
+        results.append(_result("shared ring", width, height, count, latencies))
+        ring.release()
+    return results
+
+
+def print_benchmark(results, count, fps):
+    rate = f"{fps:g} fps" if fps else "unpaced"
+    print("\n" + "=" * 72)
+    print(f"📊 FRAME TRANSFER BENCHMARK ({count} frames per run, producer {rate})")
+    print("=" * 72)
+    print(f"{'Resolution':<12}{'Transport':<14}{'Delivered':>10}{'Dropped':>9}{'Mean (ms)':>11}{'p95 (ms)':>10}")
+    for r in results:
+        print(f"{r['resolution']:<12}{r['transport']:<14}{r['delivered']:>10}{r['dropped']:>9}"
+              f"{r['latency_ms']:>11.2f}{r['latency_p95_ms']:>10.2f}")
+    print("=" * 72)
+    print("The ring drops a frame when a newer one overwrites it before it is read (overwrite-oldest).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark frame transfer between processes")
+    parser.add_argument("--frames", type=int, default=300, help="Frames per run")
+    parser.add_argument("--fps", type=float, default=BENCH_FPS, help="Producer rate (0: as fast as possible)")
+    args = parser.parse_args()
+    print_benchmark(benchmark(count=args.frames, fps=args.fps), args.frames, args.fps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Gaze Feature Extraction
+Pulls the handful of eye landmarks the tracker needs out of a MediaPipe
+face mesh and turns them into horizontal/vertical iris ratios.
+"""
+
+import numpy as np
+
+# ========================
+# LANDMARK INDICES
+# ========================
+# Grouped so that rows [2k, 2k+1] are the (left, right) pair of one feature
+L_IRIS, R_IRIS = 468, 473
+L_INNER, R_INNER = 133, 362
+L_OUTER, R_OUTER = 33, 263
+L_TOP, R_TOP = 159, 386
+L_BOTTOM, R_BOTTOM = 145, 374
+
+GAZE_LANDMARKS = (
+    L_IRIS, R_IRIS,
+    L_INNER, R_INNER,
+    L_OUTER, R_OUTER,
+    L_TOP, R_TOP,
+    L_BOTTOM, R_BOTTOM,
+)
+
+
+class GazeFeatureExtractor:
+    """Reusable extractor that gathers only the gaze landmarks into a preallocated buffer"""
+    def __init__(self):
+        self.points = np.zeros((len(GAZE_LANDMARKS), 2), dtype=np.float64)
+        self._iris = self.points[0:2]
+        self._inner = self.points[2:4]
+        self._outer = self.points[4:6]
+        self._top = self.points[6:8]
+        self._bottom = self.points[8:10]
+
+    def gather(self, landmarks, img_w, img_h, x0=0.0, y0=0.0):
+        """
+        Copy the gaze landmarks into self.points as sub-pixel image coordinates.
+
+        Landmarks found on a crop are mapped back to the full frame by passing
+        the crop's size as img_w/img_h and its top-left corner as x0/y0.
+        """
+        points = self.points
+        for row, idx in enumerate(GAZE_LANDMARKS):
+            lm = landmarks[idx]
+            points[row, 0] = lm.x
+            points[row, 1] = lm.y
+        points[:, 0] *= img_w
+        points[:, 1] *= img_h
+        if x0 or y0:
+            points[:, 0] += x0
+            points[:, 1] += y0
+        return points
+
+    def ratios(self):
+        """
+        Compute the averaged (h, v) iris ratios for both eyes from self.points.
+
+        Returns:
+            (raw_h, raw_v) tuple, or None if an eye is degenerate (zero-width/height)
+        """
+        h_range = self._inner[:, 0] - self._outer[:, 0]
+        v_range = self._bottom[:, 1] - self._top[:, 1]
+        if not (h_range.all() and v_range.all()):
+            return None
+
+        raw_h = ((self._iris[:, 0] - self._outer[:, 0]) / h_range).mean()
+        raw_v = ((self._iris[:, 1] - self._top[:, 1]) / v_range).mean()
+        return float(raw_h), float(raw_v)
+
+    def extract(self, landmarks, img_w, img_h, x0=0.0, y0=0.0):
+        """Gather landmarks and return (raw_h, raw_v), or None if the eyes are degenerate"""
+        self.gather(landmarks, img_w, img_h, x0, y0)
+        return self.ratios()
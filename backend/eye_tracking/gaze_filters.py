@@ -0,0 +1,142 @@
+"""
+Gaze Smoothing Filters
+O(1)-per-sample smoothers for the (h, v) gaze ratios. All parameters are in
+seconds rather than frames, so smoothing behaves the same whatever rate the
+landmarker runs at.
+
+Every filter has update(h, v, timestamp) -> (h, v) and reset().
+"""
+
+import math
+from collections import deque
+
+MOVING_AVERAGE = "moving_average"
+EMA = "ema"
+ONE_EURO = "one_euro"
+
+
+class MovingAverageFilter:
+    """Mean of the samples from the last window seconds, kept as running sums"""
+    RESYNC_EVERY = 1024  # Recompute the sums now and then so float drift can't build up
+
+    def __init__(self, window=0.33):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._samples = deque()
+        self._sum_h = 0.0
+        self._sum_v = 0.0
+        self._updates = 0
+
+    def update(self, h, v, timestamp):
+        samples = self._samples
+        samples.append((timestamp, h, v))
+        self._sum_h += h
+        self._sum_v += v
+
+        # The newest sample always stays in, even if the window is shorter than a frame
+        cutoff = timestamp - self.window
+        while len(samples) > 1 and samples[0][0] <= cutoff:
+            _, old_h, old_v = samples.popleft()
+            self._sum_h -= old_h
+            self._sum_v -= old_v
+
+        self._updates += 1
+        if self._updates % self.RESYNC_EVERY == 0:
+            self._sum_h = sum(s[1] for s in samples)
+            self._sum_v = sum(s[2] for s in samples)
+
+        n = len(samples)
+        return self._sum_h / n, self._sum_v / n
+
+
+class EmaFilter:
+    """Exponential moving average with a time constant in seconds"""
+    def __init__(self, time_constant=0.15):
+        self.time_constant = time_constant
+        self.reset()
+
+    def reset(self):
+        self._h = None
+        self._v = None
+        self._last_t = None
+
+    def update(self, h, v, timestamp):
+        if self._h is None:
+            self._h, self._v = h, v
+        else:
+            dt = max(timestamp - self._last_t, 0.0)
+            alpha = 1.0 - math.exp(-dt / self.time_constant) if self.time_constant > 0 else 1.0
+            self._h += alpha * (h - self._h)
+            self._v += alpha * (v - self._v)
+        self._last_t = timestamp
+        return self._h, self._v
+
+
+class _OneEuroAxis:
+    """One-Euro filter for a single value (Casiez et al. 2012)"""
+    def __init__(self, min_cutoff, beta, d_cutoff):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x = None
+        self.dx = 0.0
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, x, dt):
+        if self.x is None or dt <= 0:
+            if self.x is None:
+                self.x = x
+            return self.x
+
+        dx = (x - self.x) / dt
+        self.dx += self._alpha(self.d_cutoff, dt) * (dx - self.dx)
+        cutoff = self.min_cutoff + self.beta * abs(self.dx)
+        self.x += self._alpha(cutoff, dt) * (x - self.x)
+        return self.x
+
+
+class OneEuroFilter:
+    """
+    Speed-adaptive low-pass filter: heavy smoothing while the gaze is still,
+    little lag when it moves quickly.
+
+    Args:
+        min_cutoff: Cutoff frequency (Hz) at rest - lower is smoother
+        beta: How fast the cutoff rises with gaze speed - higher reacts faster
+        d_cutoff: Cutoff frequency (Hz) for the speed estimate
+    """
+    def __init__(self, min_cutoff=1.0, beta=0.5, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._h = _OneEuroAxis(self.min_cutoff, self.beta, self.d_cutoff)
+        self._v = _OneEuroAxis(self.min_cutoff, self.beta, self.d_cutoff)
+        self._last_t = None
+
+    def update(self, h, v, timestamp):
+        dt = 0.0 if self._last_t is None else timestamp - self._last_t
+        self._last_t = timestamp
+        return self._h.update(h, dt), self._v.update(v, dt)
+
+
+FILTERS = {
+    MOVING_AVERAGE: MovingAverageFilter,
+    EMA: EmaFilter,
+    ONE_EURO: OneEuroFilter,
+}
+
+
+def make_filter(kind=MOVING_AVERAGE, **params):
+    """Build a gaze filter by name, e.g. make_filter("ema", time_constant=0.2)"""
+    if kind not in FILTERS:
+        raise ValueError(f"Unknown gaze filter: {kind}")
+    return FILTERS[kind](**params)
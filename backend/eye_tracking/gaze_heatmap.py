@@ -0,0 +1,119 @@
+"""
+Gaze Heatmap
+Accumulates where the smoothed gaze rests over a session: a fixed 2D grid of
+ratios relative to the calibrated center, covering extent (in ratio units)
+either side of it. Each sample adds the time since the previous one to its
+cell, so the map stays a measure of time even while adaptive sampling
+changes the frame rate. O(1) per sample, constant memory for any session length.
+"""
+
+import math
+import os
+from datetime import datetime
+
+import numpy as np
+
+SESSION_DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'session_data'))
+
+MAX_SAMPLE_GAP = 1.0  # Seconds; longer gaps (face lost, gated) aren't credited to any cell
+
+
+class GazeHeatmap:
+    """Time-weighted 2D histogram of (h - center_h, v - center_v)"""
+    def __init__(self, center_h, center_v, extent=0.12, bins=48):
+        """
+        Args:
+            center_h, center_v: Calibrated center ratios
+            extent: Half-width of the grid in ratio units (the default H/V threshold is 0.04)
+            bins: Cells per axis
+        """
+        self.center_h = center_h
+        self.center_v = center_v
+        self.extent = extent
+        self.bins = bins
+        self.grid = np.zeros((bins, bins), dtype=np.float64)  # [v, h] -> seconds
+        self._scale = bins / (2 * extent)
+        self._last_timestamp = None
+        self.outside_seconds = 0.0  # Time the gaze was beyond the grid
+        self.samples = 0
+
+    def add(self, h_ratio, v_ratio, timestamp):
+        """Credit the time since the previous sample to the cell of (h_ratio, v_ratio)"""
+        last, self._last_timestamp = self._last_timestamp, timestamp
+        if last is None:
+            return
+        dt = timestamp - last
+        if dt <= 0 or dt > MAX_SAMPLE_GAP:
+            return
+
+        self.samples += 1
+        # floor, not int(): int() truncates toward zero, folding the cell just below the grid into 0
+        col = math.floor((h_ratio - self.center_h + self.extent) * self._scale)
+        row = math.floor((v_ratio - self.center_v + self.extent) * self._scale)
+        if 0 <= col < self.bins and 0 <= row < self.bins:
+            self.grid[row, col] += dt
+        else:
+            self.outside_seconds += dt
+
+    def skip(self):
+        """Mark a gap (no usable gaze) so it isn't credited to the next sample's cell"""
+        self._last_timestamp = None
+
+    def cell_center(self, row, col):
+        """(h, v) offset from the calibrated center at the middle of a cell"""
+        step = 2 * self.extent / self.bins
+        return -self.extent + (col + 0.5) * step, -self.extent + (row + 0.5) * step
+
+    def summary(self, h_threshold=None, v_threshold=None):
+        """
+        Where attention concentrated.
+
+        Returns:
+            Dict with total tracked seconds, seconds outside the grid, the peak cell's
+            (h, v) offset, and - given the thresholds - the share of time inside them
+        """
+        tracked = float(self.grid.sum())
+        total = tracked + self.outside_seconds
+        result = {"tracked_seconds": total, "outside_seconds": self.outside_seconds, "peak_offset": None,
+                  "inside_threshold_percent": None}
+        if tracked > 0:
+            row, col = np.unravel_index(int(np.argmax(self.grid)), self.grid.shape)
+            result["peak_offset"] = tuple(round(float(x), 3) for x in self.cell_center(row, col))
+        if total > 0 and h_threshold and v_threshold:
+            centers = (np.arange(self.bins) + 0.5) * (2 * self.extent / self.bins) - self.extent
+            inside_h = np.abs(centers) < h_threshold
+            inside_v = np.abs(centers) < v_threshold
+            inside = float(self.grid[np.ix_(inside_v, inside_h)].sum())
+            result["inside_threshold_percent"] = 100 * inside / total
+        return result
+
+    def ascii(self, rows=8, cols=16):
+        """Coarse text rendering of the grid, rows top to bottom (denser character = more time)"""
+        shades = " .:-=+*#%@"
+        grid = self.grid[:self.bins - self.bins % rows, :self.bins - self.bins % cols]
+        coarse = grid.reshape(rows, grid.shape[0] // rows, cols, grid.shape[1] // cols).sum(axis=(1, 3))
+        peak = coarse.max()
+        if peak <= 0:
+            return ""
+        levels = np.minimum((coarse / peak * len(shades)).astype(int), len(shades) - 1)
+        return "\n".join("|" + "".join(shades[i] for i in row) + "|" for row in levels)
+
+    def save(self, path=None):
+        """Save the grid (float32 seconds) and its geometry as a compressed .npz. Returns the path"""
+        if path is None:
+            os.makedirs(SESSION_DATA_DIR, exist_ok=True)
+            path = os.path.join(SESSION_DATA_DIR, f"gaze_heatmap_{datetime.now():%Y%m%d_%H%M%S}.npz")
+        np.savez_compressed(path, grid=self.grid.astype(np.float32), center=[self.center_h, self.center_v],
+                            extent=self.extent, outside_seconds=self.outside_seconds)
+        return path
+
+
+def load_heatmap(path):
+    """Rebuild a GazeHeatmap saved with save()"""
+    with np.load(path) as data:
+        center_h, center_v = data["center"]
+        heatmap = GazeHeatmap(float(center_h), float(center_v), extent=float(data["extent"]),
+                              bins=data["grid"].shape[0])
+        heatmap.grid[:] = data["grid"]
+        heatmap.outside_seconds = float(data["outside_seconds"])
+    return heatmap
@@ -0,0 +1,214 @@
+"""
+Gaze Sample Log
+Optional per-frame record of the gaze signal for offline analysis and
+threshold tuning. Samples go into preallocated per-column NumPy arrays
+holding one chunk; full chunks are written to a binary .gazelog file, so RAM
+stays at one chunk (about 100 KB) however long the session runs.
+
+File layout:
+    header              magic, header size (uint32), JSON header (columns, chunk_rows, rows,
+                        session times, meta), space padded to the header size
+    chunk 0             each column's chunk_rows values back to back (little endian)
+    chunk 1 ...
+
+Every chunk has the same size (the last one is zero padded), so the body is
+an array of fixed-size records and load_gaze_log() can memory-map it.
+"""
+
+import json
+import os
+import struct
+from datetime import datetime
+
+import numpy as np
+
+from eye_tracking.gaze_heatmap import SESSION_DATA_DIR
+
+FORMAT_VERSION = 1
+MAGIC = b"GAZELOG%d" % FORMAT_VERSION
+HEADER_PREFIX = struct.Struct("<8sI")  # Magic, total header size in bytes
+HEADER_SLACK = 256  # Room for the fields that grow after creation (rows, ended_at)
+HEADER_ALIGN = 1024
+CHUNK_ROWS = 4096  # About 2 minutes at 30 fps
+FLUSH_INTERVAL = 10.0  # Seconds between rewrites of the partial chunk, bounding loss on a crash
+
+# (name, dtype) in file order. Ratios are NaN when no usable face was found;
+# on_screen is -1 when there was nothing to decide on
+COLUMNS = (
+    ("t", "<f8"),          # Seconds since the log started
+    ("raw_h", "<f4"),
+    ("raw_v", "<f4"),
+    ("smooth_h", "<f4"),
+    ("smooth_v", "<f4"),
+    ("face", "u1"),
+    ("on_screen", "i1"),
+)
+
+
+def chunk_dtype(chunk_rows):
+    """Structured dtype of one on-disk chunk: one sub-array field per column"""
+    return np.dtype([(name, dtype, (chunk_rows,)) for name, dtype in COLUMNS])
+
+
+class GazeLogRecorder:
+    """Appends gaze samples to a .gazelog file in fixed-size columnar chunks"""
+    def __init__(self, path=None, start_timestamp=None, chunk_rows=CHUNK_ROWS, meta=None):
+        """
+        Args:
+            path: Output file (default: session_data/gaze_<time>.gazelog)
+            start_timestamp: Monotonic time that t=0 refers to (default: the first sample)
+            chunk_rows: Rows per chunk
+            meta: Extra JSON-serializable values stored in the header (e.g. calibration)
+        """
+        if path is None:
+            os.makedirs(SESSION_DATA_DIR, exist_ok=True)
+            path = os.path.join(SESSION_DATA_DIR, f"gaze_{datetime.now():%Y%m%d_%H%M%S}.gazelog")
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.columns = {name: np.zeros(chunk_rows, dtype=dtype) for name, dtype in COLUMNS}
+        self._chunk = np.zeros(1, dtype=chunk_dtype(chunk_rows))
+        self.start_timestamp = start_timestamp
+        self.rows = 0  # Rows written to the file, including the flushed part of the current chunk
+        self.count = 0  # Rows in the in-memory chunk
+        self.chunks_written = 0
+        self.failed = False  # A write failed; recording stopped
+        self._last_flush = None
+        self.header = {
+            "version": FORMAT_VERSION,
+            "columns": [list(c) for c in COLUMNS],
+            "chunk_rows": chunk_rows,
+            "rows": 0,
+            "started_at": datetime.now().isoformat(),
+            "ended_at": None,
+            "meta": meta or {},
+        }
+        # Sized once, from the metadata, so later header rewrites (from append()) always fit
+        needed = HEADER_PREFIX.size + len(json.dumps(self.header).encode()) + HEADER_SLACK
+        self.header_size = -(-needed // HEADER_ALIGN) * HEADER_ALIGN
+        self._file = open(path, "wb+")
+        self._write_header()
+
+    def _write_header(self):
+        body = json.dumps(self.header).encode()
+        self._file.seek(0)
+        self._file.write(HEADER_PREFIX.pack(MAGIC, self.header_size)
+                         + body.ljust(self.header_size - HEADER_PREFIX.size, b" "))
+
+    def append(self, timestamp, ratios, smoothed, face_found, on_screen):
+        """
+        Add one analyzed frame.
+
+        Args:
+            timestamp: Monotonic capture time (seconds)
+            ratios: (raw_h, raw_v) or None
+            smoothed: (smooth_h, smooth_v) or None
+            face_found: Whether the landmarker found a face
+            on_screen: GazeDecider decision (True/False) or None
+        """
+        if self.failed:
+            return
+        if self.start_timestamp is None:
+            self.start_timestamp = timestamp
+            self._last_flush = timestamp
+        i = self.count
+        c = self.columns
+        c["t"][i] = timestamp - self.start_timestamp
+        if ratios is None:
+            c["raw_h"][i] = c["raw_v"][i] = np.nan
+        else:
+            c["raw_h"][i], c["raw_v"][i] = ratios
+        if smoothed is None or ratios is None:
+            c["smooth_h"][i] = c["smooth_v"][i] = np.nan
+        else:
+            c["smooth_h"][i], c["smooth_v"][i] = smoothed
+        c["face"][i] = face_found
+        c["on_screen"][i] = -1 if on_screen is None else on_screen
+        self.count += 1
+
+        # Runs on the tracker's decision thread: a failed write stops the log, never the tracking
+        try:
+            if self.count == self.chunk_rows:
+                self._write_chunk()
+                self.chunks_written += 1
+                self.count = 0
+                self._last_flush = timestamp
+            elif timestamp - self._last_flush >= FLUSH_INTERVAL:
+                self._write_chunk()
+                self._last_flush = timestamp
+        except OSError as e:
+            self.failed = True
+            print(f"⚠️  Gaze log write failed, recording stopped: {e}")
+
+    def _write_chunk(self):
+        """(Re)write the in-memory chunk at its slot in the file and update the row count"""
+        chunk = self._chunk[0]
+        for name, values in self.columns.items():
+            chunk[name][:self.count] = values[:self.count]
+            chunk[name][self.count:] = 0
+        self._file.seek(self.header_size + self.chunks_written * self._chunk.itemsize)
+        self._file.write(self._chunk.tobytes())
+        self.rows = self.chunks_written * self.chunk_rows + self.count
+        self.header["rows"] = self.rows
+        self._write_header()
+        self._file.flush()
+
+    def close(self):
+        """Write the remaining rows and finish the header. Returns the file path"""
+        if self._file.closed:
+            return self.path
+        self.header["ended_at"] = datetime.now().isoformat()
+        try:
+            if self.failed:
+                pass  # Keep what was written; the header's row count still matches it
+            elif self.count:
+                self._write_chunk()
+            else:
+                self._write_header()
+        except OSError as e:
+            print(f"⚠️  Gaze log write failed: {e}")
+        finally:
+            self._file.close()
+        return self.path
+
+
+def _read_header(path):
+    """(header dict, header size in bytes)"""
+    with open(path, "rb") as f:
+        prefix = f.read(HEADER_PREFIX.size)
+        if len(prefix) < HEADER_PREFIX.size or not prefix.startswith(MAGIC):
+            raise ValueError(f"{path} is not a gaze log")
+        size = HEADER_PREFIX.unpack(prefix)[1]
+        raw = f.read(size - HEADER_PREFIX.size)
+    return json.loads(raw.decode().rstrip()), size
+
+
+def load_gaze_log(path, mmap=True):
+    """
+    Load a .gazelog file.
+
+    Args:
+        mmap: Memory-map the file instead of reading it (columns are still gathered into
+              contiguous arrays, so only the requested data is paged in)
+
+    Returns:
+        (header, {column: array}) with header["rows"] entries per column
+    """
+    header, header_size = _read_header(path)
+    rows, chunk_rows = header["rows"], header["chunk_rows"]
+    dtype = chunk_dtype(chunk_rows)
+    n_chunks = -(-rows // chunk_rows)
+    if mmap and n_chunks:
+        chunks = np.memmap(path, dtype=dtype, mode="r", offset=header_size, shape=(n_chunks,))
+    else:
+        with open(path, "rb") as f:
+            f.seek(header_size)
+            chunks = np.frombuffer(f.read(n_chunks * dtype.itemsize), dtype=dtype)
+    columns = {name: np.ascontiguousarray(chunks[name].reshape(-1)[:rows]) for name, _ in COLUMNS}
+    return header, columns
+
+
+def find_gaze_logs(directory=SESSION_DATA_DIR):
+    """Paths of all .gazelog files in directory, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".gazelog"))
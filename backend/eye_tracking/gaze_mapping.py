@@ -0,0 +1,83 @@
+"""
+Gaze-to-Screen Mapping
+A per-user quadratic least-squares fit from smoothed iris ratios (h, v) to
+normalized screen coordinates (x, y), where (0, 0) is the top-left and
+(1, 1) the bottom-right corner of the screen. Fitted from multi-point
+calibration; evaluated per frame as a 6x2 matrix product.
+"""
+
+import numpy as np
+
+TERMS = ("1", "h", "v", "hv", "hh", "vv")
+
+ON_SCREEN_MARGIN = 0.05  # Fraction of the screen a gaze point may fall outside it and still count
+
+# Calibration dots in normalized screen coordinates: corners, edge midpoints and center
+CALIBRATION_TARGETS = tuple((x, y) for y in (0.05, 0.5, 0.95) for x in (0.05, 0.5, 0.95))
+
+
+def design_matrix(h, v):
+    """Polynomial terms for arrays of ratios, shape (N, len(TERMS))"""
+    h = np.asarray(h, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+    return np.stack([np.ones_like(h), h, v, h * v, h * h, v * v], axis=-1)
+
+
+class GazeMapping:
+    """Fitted ratio -> screen mapping with a reusable per-frame buffer"""
+    def __init__(self, coeffs, margin=ON_SCREEN_MARGIN, rms_error=None):
+        self.coeffs = np.ascontiguousarray(coeffs, dtype=np.float64).reshape(len(TERMS), 2)
+        self.margin = margin
+        self.rms_error = rms_error
+        self._features = np.ones(len(TERMS), dtype=np.float64)
+        self._point = np.zeros(2, dtype=np.float64)
+
+    def map(self, h, v):
+        """Estimated (x, y) screen point for one pair of ratios"""
+        f = self._features
+        f[1] = h
+        f[2] = v
+        f[3] = h * v
+        f[4] = h * h
+        f[5] = v * v
+        np.dot(f, self.coeffs, out=self._point)
+        return float(self._point[0]), float(self._point[1])
+
+    def map_many(self, h, v):
+        """Vectorized map() over arrays of ratios. Returns an (N, 2) array"""
+        return design_matrix(h, v) @ self.coeffs
+
+    def contains(self, x, y):
+        """True if (x, y) lies on the screen, allowing for the margin"""
+        m = self.margin
+        return -m <= x <= 1 + m and -m <= y <= 1 + m
+
+    def to_dict(self):
+        return {"terms": list(TERMS), "coeffs": self.coeffs.tolist(), "rms_error": self.rms_error}
+
+    @classmethod
+    def from_dict(cls, data, margin=ON_SCREEN_MARGIN):
+        """Rebuild a mapping saved with to_dict(); None if the data doesn't fit this model"""
+        try:
+            if tuple(data["terms"]) != TERMS:
+                return None
+            return cls(data["coeffs"], margin=margin, rms_error=data.get("rms_error"))
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+def fit_gaze_mapping(h, v, x, y, margin=ON_SCREEN_MARGIN):
+    """
+    Least-squares fit of screen points (x, y) against ratios (h, v).
+
+    Needs at least len(TERMS) calibration points.
+    """
+    A = design_matrix(h, v)
+    targets = np.stack([np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)], axis=-1)
+    if A.shape[0] < len(TERMS):
+        raise ValueError(f"Need at least {len(TERMS)} calibration points, got {A.shape[0]}")
+
+    coeffs, _, _, _ = np.linalg.lstsq(A, targets, rcond=None)
+    residuals = A @ coeffs - targets
+    rms_error = float(np.sqrt((residuals ** 2).sum(axis=1).mean()))
+    return GazeMapping(coeffs, margin=margin, rms_error=rms_error)
@@ -0,0 +1,412 @@
+"""
+Multi-Camera Tracking
+For machines serving several webcams (study-room kiosks): each camera is
+tracked in an inference worker process, so streams scale across cores
+instead of sharing one interpreter. Workers send only small look-away
+events back; a controller in the main process tags them with per-stream
+session IDs and republishes them on an EventBus.
+
+When there are more cameras than cores, workers are capped at the core
+count and each serves several cameras round-robin. With --capture-processes
+each camera is read in its own process as well, handing frames to the
+inference worker through a shared-memory ring (see frame_ring.py).
+
+Usage (from backend/), with video files standing in for cameras:
+    python -m eye_tracking.multi_camera desk1.mp4 desk2.mp4 desk3.mp4
+    python -m eye_tracking.multi_camera 0 1 --workers 2 --capture-processes
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import time
+
+import cv2
+
+from eye_tracking.eye_tracker import (init_mediapipe, load_config, SMOOTHING, SMOOTHING_PARAMS,
+                                      FACE_ROI, ROI_INPUT_SIZE, PRESENCE_GATE, PRESENCE_IDLE_SECONDS,
+                                      PRESENCE_RECHECK_SECONDS)
+from eye_tracking.pipeline import LatestSlot, CameraReader, FrameRateGovernor, GazeEstimator
+from eye_tracking.face_roi import FaceRoiTracker
+from eye_tracking.presence_gate import PresenceGate
+from eye_tracking.focus_state import (GazeDecider, FacePresenceTracker, LOOK_AWAY_STARTED, LOOK_AWAY_ENDED,
+                                      ALARM_STARTED, FACE_LOST)
+from eye_tracking.gaze_filters import make_filter
+from eye_tracking.gaze_mapping import GazeMapping
+from eye_tracking.events import EventBus, log_event
+from eye_tracking.frame_ring import SharedFrameRing, RingReader
+
+STREAM_ENDED = "stream_ended"
+RING_ATTACH_TIMEOUT = 15.0  # Seconds to wait for a capture process to open its camera
+
+
+# ========================
+# CAPTURE PROCESS
+# ========================
+
+def _pace_fps(cap, source):
+    """Native frame rate for video files standing in for cameras; None for real cameras"""
+    if isinstance(source, int):
+        return None
+    return cap.get(cv2.CAP_PROP_FPS) or 30
+
+
+class RingSlotWriter:
+    """LatestSlot-style put()/close() that publishes into a SharedFrameRing, so CameraReader can feed it"""
+    def __init__(self, ring):
+        self.ring = ring
+
+    def put(self, frame):
+        image = frame.image
+        if image.shape != self.ring.shape:
+            height, width, _ = self.ring.shape
+            image = cv2.resize(image, (width, height))
+        self.ring.write(image, frame.frame_id, frame.timestamp)
+
+    def close(self):
+        self.ring.close()
+
+
+def capture_worker(source, ring_name, stop_event):
+    """
+    Capture process entry point: read source into a SharedFrameRing named
+    ring_name, keeping the ring alive until stop_event is set.
+    """
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"⚠️  Could not open camera source {source!r}")
+        return
+    shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+    ring = SharedFrameRing(ring_name, create=True, shape=shape)
+    reader = CameraReader(cap, RingSlotWriter(ring), pace_fps=_pace_fps(cap, source))
+    reader.start()
+    try:
+        stop_event.wait()
+    except KeyboardInterrupt:
+        pass  # The controller shuts everything down
+    finally:
+        reader.stop()
+        reader.join(timeout=2)
+        cap.release()
+        ring.release()
+
+
+def attach_ring(ring_name, stop_event, timeout=RING_ATTACH_TIMEOUT):
+    """Wait for a capture process to create ring_name and attach to it. Returns None on timeout"""
+    deadline = time.monotonic() + timeout
+    while not stop_event.is_set() and time.monotonic() < deadline:
+        try:
+            ring = SharedFrameRing(ring_name)
+        except (FileNotFoundError, ValueError):
+            ring = None  # Not created yet, or created but not yet sized
+        if ring is not None:
+            if ring.slots and all(ring.shape):
+                return ring
+            ring.release()  # Header not written yet
+        time.sleep(0.05)
+    return None
+
+
+# ========================
+# WORKER PROCESS
+# ========================
+
+class CameraStream:
+    """One camera's capture thread, landmarker and look-away state inside a worker process"""
+    def __init__(self, stream_id, source, center, mapping, config, ring=None):
+        """
+        Args:
+            ring: Attached SharedFrameRing fed by a capture process; None reads source on a thread here
+        """
+        self.stream_id = stream_id
+        self.ring = ring
+        if ring is None:
+            self.cap = cv2.VideoCapture(source)
+            self.frame_slot = LatestSlot()
+            self.reader = CameraReader(self.cap, self.frame_slot, pace_fps=_pace_fps(self.cap, source))
+        else:
+            self.cap = self.reader = None
+            self.frame_slot = RingReader(ring)
+
+        self.landmarker = init_mediapipe()
+        self.governor = FrameRateGovernor(config.target_fps)
+        self.estimator = GazeEstimator(self.landmarker,
+                                       FaceRoiTracker(max_input_size=ROI_INPUT_SIZE, enabled=FACE_ROI),
+                                       gate=PresenceGate(idle_after=PRESENCE_IDLE_SECONDS,
+                                                         recheck_interval=PRESENCE_RECHECK_SECONDS,
+                                                         enabled=PRESENCE_GATE))
+        self.decider = GazeDecider(center[0], center[1], config.h_threshold, config.v_threshold,
+                                   config.min_look_away, config.alarm_duration,
+                                   gaze_filter=make_filter(SMOOTHING, **SMOOTHING_PARAMS), mapping=mapping)
+        self.presence = FacePresenceTracker()
+        self.frames_processed = 0
+        self.last_timestamp = time.monotonic()
+        self.started_at = time.monotonic()
+
+    def start(self):
+        if self.reader:
+            self.reader.start()
+
+    def process(self, frame):
+        """Run one frame through inference and the look-away logic. Returns [(kind, timestamp, data)]"""
+        events = []
+        face_found, ratios = self.estimator.process(frame.image, frame.timestamp)
+        self.frames_processed += 1
+        self.last_timestamp = frame.timestamp
+
+        face_event = self.presence.update(face_found, frame.timestamp)
+        if face_event:
+            events.append((face_event, frame.timestamp, {}))
+
+        tracker = self.decider.tracker
+        alarm_was_on = tracker.alarm_triggered
+        _, event = self.decider.update(ratios, frame.timestamp)
+        if event:
+            events.append((event, frame.timestamp, {"elapsed": round(tracker.elapsed, 2)}))
+        if tracker.alarm_triggered and not alarm_was_on:
+            events.append((ALARM_STARTED, frame.timestamp, {"elapsed": round(tracker.elapsed, 2)}))
+        return events
+
+    def close(self):
+        """Stop capture and release everything. Returns the final [(kind, timestamp, data)]"""
+        events = []
+        if self.decider.tracker.finish() == LOOK_AWAY_ENDED:
+            events.append((LOOK_AWAY_ENDED, self.last_timestamp, {}))
+
+        if self.reader:
+            self.reader.stop()
+            self.reader.join(timeout=2)
+            self.cap.release()
+        frames_read = self.frame_slot.put_count  # A RingReader reads this from the ring, so before release()
+        if not self.reader:
+            self.ring.release()
+        self.landmarker.close()
+
+        duration = time.monotonic() - self.started_at
+        events.append((STREAM_ENDED, self.last_timestamp, {
+            "frames_read": frames_read,
+            "frames_processed": self.frames_processed,
+            "average_fps": self.frames_processed / duration if duration > 0 else 0.0,
+        }))
+        return events
+
+
+def inference_worker(streams, center, mapping_data, config, event_queue, stop_event):
+    """
+    Worker process entry point: track each (stream_id, source, ring_name) in
+    streams until their sources end or stop_event is set, posting
+    (stream_id, kind, timestamp, wall_time, data) tuples to event_queue.
+    ring_name is None to read the source in this process.
+    """
+    mapping = GazeMapping.from_dict(mapping_data) if mapping_data else None
+
+    def post(stream, items):
+        for kind, timestamp, data in items:
+            event_queue.put((stream.stream_id, kind, timestamp, time.time(), data))
+
+    active = []
+    try:
+        for stream_id, source, ring_name in streams:
+            ring = None
+            if ring_name:
+                ring = attach_ring(ring_name, stop_event)
+                if ring is None:
+                    event_queue.put((stream_id, STREAM_ENDED, time.monotonic(), time.time(),
+                                     {"error": f"no frames from {source!r}"}))
+                    continue
+            stream = CameraStream(stream_id, source, center, mapping, config, ring=ring)
+            stream.start()
+            active.append(stream)
+
+        while active and not stop_event.is_set():
+            busy = False
+            for stream in list(active):
+                frame = stream.frame_slot.get(timeout=0)
+                if frame is None:
+                    if stream.frame_slot.closed:
+                        active.remove(stream)  # First, so the finally block can't close it twice
+                        post(stream, stream.close())
+                    continue
+                if not stream.governor.ready(frame.timestamp):
+                    continue
+                busy = True
+                post(stream, stream.process(frame))
+
+            if not busy:
+                time.sleep(0.002)
+    except KeyboardInterrupt:
+        pass  # The controller shuts everything down
+    finally:
+        for stream in active:
+            post(stream, stream.close())
+
+
+# ========================
+# CONTROLLER
+# ========================
+
+class MultiCameraController:
+    """Spawns the inference workers and aggregates their events per stream"""
+    def __init__(self, sources, center=(0.5, 0.45), mapping=None, events=None, max_workers=None,
+                 capture_processes=False):
+        """
+        Args:
+            sources: Camera indices and/or video file paths
+            center: (center_h, center_v) calibration shared by all streams
+            mapping: GazeMapping shared by all streams (optional)
+            events: EventBus to republish tagged events on (optional; the caller starts and stops it)
+            max_workers: Worker processes to use (default: one per camera, at most one per core)
+            capture_processes: Read each camera in its own process, sharing frames through a SharedFrameRing
+        """
+        self.sources = list(sources)
+        self.center = center
+        self.mapping = mapping
+        self.events = events
+        self.max_workers = max_workers or min(len(self.sources), os.cpu_count() or 1)
+        self.capture_processes = capture_processes
+
+        started = int(time.time())
+        self.stream_ids = [f"stream{i}" for i in range(len(self.sources))]
+        self.session_ids = {sid: f"session_{started}_{sid}" for sid in self.stream_ids}
+        self.ring_names = {sid: f"gaze_{os.getpid()}_{sid}" if capture_processes else None
+                           for sid in self.stream_ids}
+        self.stats = {sid: {"source": str(src), "session_id": self.session_ids[sid], "look_aways": 0,
+                            "look_away_seconds": 0.0, "alarms": 0, "face_lost": 0}
+                      for sid, src in zip(self.stream_ids, self.sources)}
+        self._look_away_started = {}
+
+    def _assign(self):
+        """Round-robin streams over the workers"""
+        assignments = [[] for _ in range(self.max_workers)]
+        for i, (sid, src) in enumerate(zip(self.stream_ids, self.sources)):
+            assignments[i % self.max_workers].append((sid, src, self.ring_names[sid]))
+        return [a for a in assignments if a]
+
+    def _record(self, stream_id, kind, wall_time, data):
+        stats = self.stats[stream_id]
+        if kind == LOOK_AWAY_STARTED:
+            self._look_away_started[stream_id] = wall_time
+        elif kind == LOOK_AWAY_ENDED:
+            started = self._look_away_started.pop(stream_id, None)
+            if started is not None:
+                stats["look_aways"] += 1
+                stats["look_away_seconds"] += wall_time - started
+        elif kind == ALARM_STARTED:
+            stats["alarms"] += 1
+        elif kind == FACE_LOST:
+            stats["face_lost"] += 1
+        elif kind == STREAM_ENDED:
+            stats.update(data)
+
+    def _handle(self, stream_id, kind, timestamp, wall_time, data):
+        """Count a worker event and republish it, tagged with its stream and session"""
+        self._record(stream_id, kind, wall_time, data)
+        if self.events:
+            self.events.publish(kind, timestamp, stream_id=stream_id,
+                                session_id=self.session_ids[stream_id], **data)
+
+    def run(self):
+        """Track every stream until all sources end (or Ctrl+C). Returns the per-stream stats"""
+        ctx = multiprocessing.get_context("spawn")
+        event_queue = ctx.Queue()
+        stop_event = ctx.Event()
+        config = load_config()
+        mapping_data = self.mapping.to_dict() if self.mapping else None
+
+        workers = [
+            ctx.Process(target=inference_worker, name=f"InferenceWorker-{i}",
+                        args=(streams, self.center, mapping_data, config, event_queue, stop_event))
+            for i, streams in enumerate(self._assign())
+        ]
+        if self.capture_processes:
+            workers += [
+                ctx.Process(target=capture_worker, name=f"CaptureWorker-{sid}",
+                            args=(src, self.ring_names[sid], stop_event))
+                for sid, src in zip(self.stream_ids, self.sources)
+            ]
+        print(f"\n👁️  Tracking {len(self.sources)} streams on {len(workers)} worker processes")
+        for worker in workers:
+            worker.start()
+
+        remaining = set(self.stream_ids)
+        try:
+            while remaining:
+                try:
+                    stream_id, kind, timestamp, wall_time, data = event_queue.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(w.is_alive() for w in workers if w.name.startswith("InferenceWorker")):
+                        break
+                    continue
+
+                if kind == STREAM_ENDED:
+                    remaining.discard(stream_id)
+                self._handle(stream_id, kind, timestamp, wall_time, data)
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping camera workers...")
+        finally:
+            stop_event.set()
+            # Keep draining so workers can flush their final events and exit
+            deadline = time.monotonic() + 5
+            while any(w.is_alive() for w in workers) and time.monotonic() < deadline:
+                try:
+                    self._handle(*event_queue.get(timeout=0.1))
+                except queue.Empty:
+                    pass
+            for worker in workers:
+                worker.join(timeout=1)
+                if worker.is_alive():
+                    worker.terminate()
+            while True:  # Events the workers queued just before exiting
+                try:
+                    self._handle(*event_queue.get(timeout=0.1))
+                except queue.Empty:
+                    break
+
+        return self.stats
+
+
+def print_stats(stats):
+    print("\n" + "=" * 50)
+    print("📊 MULTI-CAMERA SUMMARY")
+    print("=" * 50)
+    for stream_id, s in stats.items():
+        print(f"{stream_id} ({s['source']}) - {s['session_id']}")
+        print(f"  Look Aways: {s['look_aways']} (Total: {s['look_away_seconds']:.1f}s), Alarms: {s['alarms']}, "
+              f"Face lost: {s['face_lost']}")
+        if "error" in s:
+            print(f"  ⚠️  {s['error']}")
+        if "frames_processed" in s:
+            print(f"  Frames: {s['frames_processed']} analyzed of {s['frames_read']} read "
+                  f"({s['average_fps']:.1f} fps)")
+    print("=" * 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track several cameras (or video files) in worker processes")
+    parser.add_argument("sources", nargs="+", help="Camera indices or video files")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per camera, capped at cores)")
+    parser.add_argument("--center-h", type=float, default=0.5)
+    parser.add_argument("--center-v", type=float, default=0.45)
+    parser.add_argument("--capture-processes", action="store_true",
+                        help="Read each camera in its own process via shared memory")
+    parser.add_argument("--quiet", action="store_true", help="Don't print every event")
+    args = parser.parse_args()
+
+    sources = [int(s) if s.isdigit() else s for s in args.sources]
+    events = EventBus()
+    if not args.quiet:
+        events.subscribe(log_event)
+    events.start()
+
+    controller = MultiCameraController(sources, center=(args.center_h, args.center_v), events=events,
+                                       max_workers=args.workers, capture_processes=args.capture_processes)
+    try:
+        stats = controller.run()
+    finally:
+        events.stop()
+    print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
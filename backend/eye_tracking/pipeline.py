@@ -0,0 +1,239 @@
+"""
+Eye Tracker Pipeline
+Camera capture and landmark inference run on their own threads and hand
+results forward through single-value "latest" slots, so a slow stage never
+builds up a backlog of stale frames.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import mediapipe as mp
+
+from eye_tracking.gaze_features import GazeFeatureExtractor
+from eye_tracking.face_roi import FaceRoiTracker
+from eye_tracking.stage_profiler import StageProfiler
+
+# One captured camera frame. timestamp is time.monotonic() (seconds) at capture
+Frame = namedtuple("Frame", ["frame_id", "timestamp", "image"])
+
+# One inference result. image is the raw (unmirrored) camera frame and
+# ratios is (raw_h, raw_v) or None when no usable face was found
+GazeSample = namedtuple("GazeSample", ["frame_id", "timestamp", "image", "face_found", "ratios"])
+
+
+class LatestSlot:
+    """Bounded (size 1) hand-off between stages that keeps only the newest item"""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._pending = False
+        self.closed = False
+        self.put_count = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """Publish an item, overwriting (and counting as dropped) any unread one"""
+        with self._cond:
+            if self._pending:
+                self.dropped += 1
+            self._item = item
+            self._pending = True
+            self.put_count += 1
+            self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """Wait for an unread item and take it. Returns None on timeout or once closed and drained"""
+        with self._cond:
+            if not self._pending and not self.closed:
+                self._cond.wait(timeout)
+            if not self._pending:
+                return None
+            item, self._item = self._item, None
+            self._pending = False
+            return item
+
+    def close(self):
+        """Mark the producer as finished and wake any waiting consumer"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class FrameRateGovernor:
+    """Lets through at most target_fps frames per second, based on capture timestamps"""
+    def __init__(self, target_fps=None):
+        self.set_target_fps(target_fps)
+        self._next_due = None
+        self.skipped = 0
+
+    def set_target_fps(self, target_fps):
+        """Change the rate limit (None = let every frame through); takes effect on the next frame"""
+        self.interval = 1.0 / target_fps if target_fps else 0.0
+
+    def ready(self, timestamp):
+        """True if a frame captured at timestamp should be processed, otherwise count it as skipped"""
+        if self._next_due is not None and timestamp < self._next_due:
+            self.skipped += 1
+            return False
+        # Schedule from the previous due time to hold the average rate, but never
+        # let a stall build up a burst of catch-up frames
+        if self._next_due is None or timestamp - self._next_due > self.interval:
+            self._next_due = timestamp
+        self._next_due += self.interval
+        return True
+
+
+class VideoTimestamper:
+    """Converts capture timestamps into the strictly increasing millisecond clock detect_for_video requires"""
+    def __init__(self):
+        self._origin = None
+        self._last_ms = -1
+
+    def __call__(self, timestamp):
+        if self._origin is None:
+            self._origin = timestamp
+        timestamp_ms = max(int((timestamp - self._origin) * 1000), self._last_ms + 1)
+        self._last_ms = timestamp_ms
+        return timestamp_ms
+
+
+class CameraReader(threading.Thread):
+    """
+    Reads frames from a cv2.VideoCapture as fast as the camera delivers them.
+
+    Set pace_fps when reading a video file as a stand-in camera, so frames
+    arrive in real time instead of as fast as they can be decoded.
+    """
+    def __init__(self, cap, out_slot, pace_fps=None, profiler=None):
+        super().__init__(name="CameraReader", daemon=True)
+        self.cap = cap
+        self.out_slot = out_slot
+        self.profiler = profiler or StageProfiler()
+        self.pace_interval = 1.0 / pace_fps if pace_fps else 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        frame_id = 0
+        next_frame_at = time.monotonic()
+        try:
+            while not self._stop_event.is_set() and self.cap.isOpened():
+                if self.pace_interval:
+                    next_frame_at += self.pace_interval
+                    delay = next_frame_at - time.monotonic()
+                    if delay > 0:
+                        self._stop_event.wait(delay)
+                t0 = time.perf_counter()
+                success, image = self.cap.read()
+                self.profiler.record("read", time.perf_counter() - t0)
+                if not success:
+                    break
+                self.out_slot.put(Frame(frame_id, time.monotonic(), image))
+                frame_id += 1
+        finally:
+            self.out_slot.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class GazeEstimator:
+    """
+    Per-frame gaze inference: crop/convert, landmark detection, feature math.
+
+    Each step's duration is recorded in profiler (flip, convert, detect, features).
+    With a PresenceGate, frames are screened by a cheap face detector while
+    nobody is in view and the landmarker is skipped when it sees no one.
+    """
+    def __init__(self, landmarker, roi=None, profiler=None, gate=None):
+        self.landmarker = landmarker
+        self.roi = roi or FaceRoiTracker(enabled=False)
+        self.profiler = profiler or StageProfiler()
+        self.gate = gate
+        self.extractor = GazeFeatureExtractor()
+        self._to_video_ms = VideoTimestamper()
+
+    def prepare(self, raw_image):
+        """Raw BGR frame -> (mp.Image, region) ready for the landmarker"""
+        t0 = time.perf_counter()
+        bgr_image, region = self.roi.mirror(raw_image)
+        t1 = time.perf_counter()
+        rgb_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_image)
+        t2 = time.perf_counter()
+        self.profiler.record("flip", t1 - t0)
+        self.profiler.record("convert", t2 - t1)
+        return mp_image, region
+
+    def infer(self, mp_image, timestamp):
+        """Run the landmarker on a prepared image captured at monotonic timestamp (seconds)"""
+        t0 = time.perf_counter()
+        results = self.landmarker.detect_for_video(mp_image, self._to_video_ms(timestamp))
+        self.profiler.record("detect", time.perf_counter() - t0)
+        return results
+
+    def features(self, results, region, frame_shape):
+        """
+        Turn landmarker results into gaze ratios and update the face ROI.
+
+        Returns:
+            (face_found, ratios) where ratios is (raw_h, raw_v) or None
+        """
+        t0 = time.perf_counter()
+        face_found = bool(results.face_landmarks)
+        landmarks = results.face_landmarks[0] if face_found else None
+        ratios = None
+        if face_found:
+            x0, y0, w, h = region
+            ratios = self.extractor.extract(landmarks, w, h, x0, y0)
+        self.roi.update(landmarks, region, frame_shape)
+        self.profiler.record("features", time.perf_counter() - t0)
+        return face_found, ratios
+
+    def process(self, raw_image, timestamp):
+        """Run all steps on one frame. Returns (face_found, ratios)"""
+        if self.gate is not None and self.gate.enabled:
+            t0 = time.perf_counter()
+            allowed = self.gate.allow(raw_image, timestamp)
+            self.profiler.record("gate", time.perf_counter() - t0)
+            if not allowed:
+                return False, None
+
+        mp_image, region = self.prepare(raw_image)
+        results = self.infer(mp_image, timestamp)
+        face_found, ratios = self.features(results, region, raw_image.shape)
+        if self.gate is not None:
+            self.gate.observe(face_found, timestamp)
+        return face_found, ratios
+
+
+class InferenceWorker(threading.Thread):
+    """Runs the face landmarker on the newest camera frame and publishes gaze ratios"""
+    def __init__(self, landmarker, in_slot, out_slot, target_fps=None, roi=None, profiler=None, gate=None):
+        super().__init__(name="InferenceWorker", daemon=True)
+        self.in_slot = in_slot
+        self.out_slot = out_slot
+        self.governor = FrameRateGovernor(target_fps)
+        self.estimator = GazeEstimator(landmarker, roi, profiler, gate)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.is_set():
+                frame = self.in_slot.get(timeout=0.1)
+                if frame is None:
+                    if self.in_slot.closed:
+                        break
+                    continue
+                if not self.governor.ready(frame.timestamp):
+                    continue
+
+                face_found, ratios = self.estimator.process(frame.image, frame.timestamp)
+                self.out_slot.put(GazeSample(frame.frame_id, frame.timestamp, frame.image, face_found, ratios))
+        finally:
+            self.out_slot.close()
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,93 @@
+"""
+Face Presence Gate
+While nobody is in front of the camera (the user is on a break), running the
+full FaceLandmarker on every frame only confirms there is no face. The gate
+takes over once the landmarker has found no face for idle_after seconds: each
+frame is first checked with OpenCV's Haar face cascade on a small grayscale
+copy, and the landmarker only runs again when the cascade sees a face.
+
+The cascade misses some faces the landmarker would find (strong head turns,
+poor light), so the landmarker is also woken every recheck_interval seconds.
+"""
+
+import os
+import time
+
+import cv2
+
+CASCADE_FILE = "haarcascade_frontalface_default.xml"
+
+
+def default_cascade_path():
+    """The frontal face cascade bundled with opencv-python, or None if this build has none"""
+    data_dir = getattr(getattr(cv2, "data", None), "haarcascades", None)
+    if not data_dir:
+        return None
+    path = os.path.join(data_dir, CASCADE_FILE)
+    return path if os.path.exists(path) else None
+
+
+class PresenceGate:
+    """Decides per frame whether the landmarker needs to run"""
+    def __init__(self, idle_after=2.0, recheck_interval=2.0, detect_width=160, cascade_path=None, enabled=True):
+        """
+        Args:
+            idle_after: Seconds without a landmarker face before gating starts
+            recheck_interval: Max seconds between landmarker runs while gated
+            detect_width: Width (px) the frame is downscaled to for the cascade
+            cascade_path: Haar/LBP cascade XML (default: OpenCV's bundled frontal face cascade)
+            enabled: Set False to always run the landmarker
+        """
+        self.idle_after = idle_after
+        self.recheck_interval = recheck_interval
+        self.detect_width = detect_width
+        self.cascade = None
+        if enabled:
+            path = cascade_path or default_cascade_path()
+            cascade = cv2.CascadeClassifier(path) if path else None
+            if cascade is not None and not cascade.empty():
+                self.cascade = cascade
+            else:
+                print("⚠️  No face cascade available - presence gate disabled")
+
+        self._last_face = None  # Set at the first frame, in the caller's clock (monotonic live, video time in replays)
+        self._last_landmarker = 0.0
+        self.cascade_runs = 0
+        self.gated_frames = 0
+
+    @property
+    def enabled(self):
+        return self.cascade is not None
+
+    def idle(self, timestamp):
+        """True while the landmarker has seen no face for idle_after seconds"""
+        return timestamp - self._last_face >= self.idle_after
+
+    def detect(self, raw_image):
+        """Cheap check: does the cascade find a face in the downscaled grayscale frame?"""
+        self.cascade_runs += 1
+        img_h, img_w = raw_image.shape[:2]
+        if img_w > self.detect_width:
+            scale = self.detect_width / img_w
+            raw_image = cv2.resize(raw_image, (self.detect_width, max(1, round(img_h * scale))),
+                                   interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(raw_image, cv2.COLOR_BGR2GRAY)
+        faces = self.cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=3, minSize=(20, 20))
+        return len(faces) > 0
+
+    def allow(self, raw_image, timestamp):
+        """True if the landmarker should run on this frame (captured at monotonic timestamp)"""
+        if self._last_face is None:
+            self._last_face = timestamp
+        if not self.enabled or not self.idle(timestamp):
+            return True
+        if timestamp - self._last_landmarker >= self.recheck_interval or self.detect(raw_image):
+            return True
+        self.gated_frames += 1
+        return False
+
+    def observe(self, face_found, timestamp):
+        """Report the landmarker result for a frame that allow() let through"""
+        self._last_landmarker = timestamp
+        if face_found:
+            self._last_face = timestamp
@@ -0,0 +1,97 @@
+"""
+Alarm Window
+Draws the look-away status over the camera frame. Rendering is kept off the
+analysis hot path: it can be switched off entirely (headless) or downscaled
+and rate-limited (preview).
+"""
+
+import time
+
+import cv2
+
+# Display modes
+HEADLESS = "headless"  # No window, no drawing - stop with Ctrl+C
+PREVIEW = "preview"    # Downscaled overlay at a capped rate
+FULL = "full"          # Full-resolution overlay on every analyzed frame
+
+DISPLAY_MODES = (HEADLESS, PREVIEW, FULL)
+
+
+def describe_status(tracker, on_screen):
+    """
+    Build the overlay for the current look-away state.
+
+    Returns:
+        (txt, color, alarm) where txt is None while the alarm text is blinked off
+    """
+    if on_screen:
+        return "ON SCREEN", (0, 255, 0), False
+
+    if tracker.alarm_triggered:
+        txt = f"ALARM: RETURN TO SCREEN ({int(tracker.elapsed)}s)"
+        if int(time.time() * 2) % 2 == 0:
+            txt = None
+        return txt, (0, 0, 255), True
+
+    return f"AWAY: {int(tracker.elapsed)}s", (0, 165, 255), False
+
+
+class AlarmWindow:
+    """OpenCV window showing the tracker status in the chosen display mode"""
+    def __init__(self, title, mode=PREVIEW, max_fps=5, width=480):
+        if mode not in DISPLAY_MODES:
+            raise ValueError(f"Unknown display mode: {mode}")
+        self.title = title
+        self.mode = mode
+        self.width = width
+        self.interval = 1.0 / max_fps if mode == PREVIEW and max_fps else 0.0
+        self._next_render = 0.0
+        self.frames_rendered = 0
+
+    @property
+    def enabled(self):
+        return self.mode != HEADLESS
+
+    def due(self, now):
+        """True if a frame should be rendered at monotonic time now"""
+        return self.enabled and now >= self._next_render
+
+    def render(self, image, status, now):
+        """
+        Draw status over image and show it.
+
+        Args:
+            image: Raw (unmirrored) BGR camera frame
+            status: (txt, color, alarm) from describe_status, or None for no overlay
+            now: Monotonic time of this render
+        """
+        self._next_render = now + self.interval
+
+        scale = 1.0
+        if self.mode == PREVIEW and image.shape[1] > self.width:
+            scale = self.width / image.shape[1]
+            image = cv2.resize(image, (self.width, int(image.shape[0] * scale)),
+                               interpolation=cv2.INTER_AREA)
+        image = cv2.flip(image, 1)
+
+        if status is not None:
+            txt, color, alarm = status
+            img_h, img_w = image.shape[:2]
+            if alarm:
+                cv2.rectangle(image, (0, 0), (img_w, img_h), (0, 0, 255), max(1, int(25 * scale)))
+            if txt:
+                cv2.putText(image, txt, (int(30 * scale), int(65 * scale)), cv2.FONT_HERSHEY_DUPLEX,
+                            1.2 * scale, color, max(1, round(2 * scale)))
+
+        cv2.imshow(self.title, image)
+        self.frames_rendered += 1
+
+    def poll_key(self):
+        """Pump window events and return the pressed key (or -1 when headless)"""
+        if not self.enabled:
+            return -1
+        return cv2.waitKey(1) & 0xFF
+
+    def close(self):
+        if self.enabled:
+            cv2.destroyAllWindows()
@@ -0,0 +1,256 @@
+"""
+Offline Replay & Benchmark
+Runs the full gaze pipeline over a recorded video (or a directory of frames)
+as fast as possible - the same GazeEstimator.process() path as the live
+stream, presence gate included - timing every stage with a StageProfiler and
+optionally scoring the on/off-screen decisions against ground-truth labels.
+
+Usage (from backend/):
+    python -m eye_tracking.replay session.mp4 --labels session_labels.csv
+    python -m eye_tracking.replay frames_dir/ --fps 30 --json report.json
+
+Labels are a CSV of "frame,on_screen" rows (on_screen is 1 or 0, header optional).
+Frames without a label are not scored.
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+
+import cv2
+
+from eye_tracking.eye_tracker import (init_mediapipe, H_THRESHOLD, V_THRESHOLD, MIN_LOOK_AWAY_DURATION,
+                                      ALARM_DURATION, ROI_INPUT_SIZE, SMOOTHING, SMOOTHING_PARAMS,
+                                      PRESENCE_GATE, PRESENCE_IDLE_SECONDS, PRESENCE_RECHECK_SECONDS)
+from eye_tracking.gaze_filters import make_filter
+from eye_tracking.pipeline import GazeEstimator
+from eye_tracking.face_roi import FaceRoiTracker
+from eye_tracking.presence_gate import PresenceGate
+from eye_tracking.stage_profiler import StageProfiler, print_stage_summary
+from eye_tracking.focus_state import GazeDecider, LOOK_AWAY_STARTED
+from eye_tracking.calibration_store import load_calibration, load_mapping
+from eye_tracking.gaze_mapping import GazeMapping
+
+DEFAULT_FPS = 30
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+# ========================
+# FRAME SOURCES
+# ========================
+
+def iter_video(path):
+    """Yield (frame_id, timestamp, image) from a video file, timestamps in video seconds"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+    frame_id = 0
+    try:
+        while True:
+            success, image = cap.read()
+            if not success:
+                break
+            yield frame_id, frame_id / fps, image
+            frame_id += 1
+    finally:
+        cap.release()
+
+
+def iter_frame_dir(path, fps=DEFAULT_FPS):
+    """Yield (frame_id, timestamp, image) from the images in a directory, in name order"""
+    names = sorted(n for n in os.listdir(path) if n.lower().endswith(IMAGE_EXTENSIONS))
+    for frame_id, name in enumerate(names):
+        image = cv2.imread(os.path.join(path, name))
+        if image is None:
+            print(f"⚠️  Skipping unreadable frame: {name}")
+            continue
+        yield frame_id, frame_id / fps, image
+
+
+def open_frame_source(path, fps=None):
+    if os.path.isdir(path):
+        return iter_frame_dir(path, fps or DEFAULT_FPS)
+    return iter_video(path)
+
+
+def load_labels(path):
+    """Load a frame -> on_screen (bool) mapping from a labels CSV"""
+    labels = {}
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 2:
+                continue
+            try:
+                labels[int(row[0])] = bool(int(row[1]))
+            except ValueError:
+                continue  # Header or malformed row
+    return labels
+
+
+def load_center():
+    """Most recently saved (center_h, center_v) from calibration.json, or the tracker defaults"""
+    return load_calibration() or (0.5, 0.45)
+
+
+def load_saved_mapping():
+    """Most recently saved multi-point GazeMapping, or None"""
+    saved = load_mapping()
+    return GazeMapping.from_dict(saved) if saved else None
+
+
+# ========================
+# REPLAY
+# ========================
+
+def replay(source, labels=None, center=None, fps=None, max_frames=None, face_roi=True,
+           roi_input_size=ROI_INPUT_SIZE, mapping=None, presence_gate=PRESENCE_GATE):
+    """
+    Replay a recording through the gaze pipeline and return a report dict.
+
+    Args:
+        source: Video file or directory of frames
+        labels: Optional {frame_id: on_screen} ground truth
+        center: (center_h, center_v) calibration; defaults to calibration.json
+        fps: Frame rate for a directory of frames (videos use their own)
+        max_frames: Stop after this many frames
+        face_roi: Use face-ROI cropping like the live stream
+        roi_input_size: Crop downscale size when face_roi is on
+        mapping: GazeMapping to decide on/off screen with (default: the H/V threshold box)
+        presence_gate: Screen frames with the presence gate like the live stream
+    """
+    center_h, center_v = center or load_center()
+    landmarker = init_mediapipe()
+    profiler = StageProfiler()
+    gate = PresenceGate(idle_after=PRESENCE_IDLE_SECONDS, recheck_interval=PRESENCE_RECHECK_SECONDS,
+                        enabled=presence_gate)
+    estimator = GazeEstimator(landmarker, FaceRoiTracker(max_input_size=roi_input_size, enabled=face_roi),
+                              profiler=profiler, gate=gate)
+    decider = GazeDecider(center_h, center_v, H_THRESHOLD, V_THRESHOLD, MIN_LOOK_AWAY_DURATION, ALARM_DURATION,
+                          gaze_filter=make_filter(SMOOTHING, **SMOOTHING_PARAMS), mapping=mapping)
+
+    frames = 0
+    faces = 0
+    look_aways = 0
+    scored = agree = 0
+    confusion = {"on_on": 0, "on_off": 0, "off_on": 0, "off_off": 0}  # label_decision
+
+    frame_iter = open_frame_source(source, fps)
+    clock = time.perf_counter
+    start = clock()
+    try:
+        while max_frames is None or frames < max_frames:
+            t0 = clock()
+            item = next(frame_iter, None)
+            if item is None:
+                break
+            frame_id, timestamp, image = item
+            profiler.record("read", clock() - t0)
+
+            face_found, ratios = estimator.process(image, timestamp)
+            t0 = clock()
+            on_screen, event = decider.update(ratios, timestamp)
+            profiler.record("decision", clock() - t0)
+
+            frames += 1
+            faces += face_found
+            look_aways += event == LOOK_AWAY_STARTED
+
+            if labels and frame_id in labels:
+                # No usable face counts as looking away
+                decided = bool(on_screen)
+                expected = labels[frame_id]
+                scored += 1
+                agree += decided == expected
+                confusion[f"{'on' if expected else 'off'}_{'on' if decided else 'off'}"] += 1
+    finally:
+        landmarker.close()
+
+    wall = clock() - start
+    report = {
+        "source": source,
+        "frames": frames,
+        "wall_seconds": wall,
+        "end_to_end_fps": frames / wall if wall > 0 else 0.0,
+        "face_found_rate": faces / frames if frames else 0.0,
+        "look_aways": look_aways,
+        "roi": {"cropped_frames": estimator.roi.cropped_frames, "full_frames": estimator.roi.full_frames},
+        "presence_gate": {"enabled": gate.enabled, "gated_frames": gate.gated_frames,
+                          "cascade_runs": gate.cascade_runs},
+        "stages_ms": profiler.summary(),
+    }
+    if labels:
+        report["agreement"] = {
+            "scored_frames": scored,
+            "rate": agree / scored if scored else None,
+            "confusion": confusion,
+        }
+    return report
+
+
+def print_report(report):
+    print("\n" + "=" * 50)
+    print("📊 REPLAY REPORT")
+    print("=" * 50)
+    print(f"Source: {report['source']}")
+    print(f"Frames: {report['frames']} in {report['wall_seconds']:.2f}s "
+          f"({report['end_to_end_fps']:.1f} fps end-to-end)")
+    print(f"Face found: {report['face_found_rate'] * 100:.1f}%  |  Look aways: {report['look_aways']}")
+    print(f"ROI: {report['roi']['cropped_frames']} on face crop / {report['roi']['full_frames']} full-frame")
+    gate = report["presence_gate"]
+    if gate["enabled"]:
+        print(f"Presence gate: {gate['gated_frames']} frames skipped, {gate['cascade_runs']} cascade runs")
+    print_stage_summary(report["stages_ms"], "Stage Timings")
+
+    agreement = report.get("agreement")
+    if agreement:
+        rate = agreement["rate"]
+        rate_txt = f"{rate * 100:.1f}%" if rate is not None else "n/a"
+        c = agreement["confusion"]
+        print(f"\nAgreement: {rate_txt} over {agreement['scored_frames']} labeled frames")
+        print(f"  on-screen  labeled -> decided on {c['on_on']}, off {c['on_off']}")
+        print(f"  off-screen labeled -> decided on {c['off_on']}, off {c['off_off']}")
+    print("=" * 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recording through the eye tracker pipeline")
+    parser.add_argument("source", help="Video file or directory of frames")
+    parser.add_argument("--labels", help="CSV of frame,on_screen ground truth")
+    parser.add_argument("--fps", type=float, help=f"Frame rate for a frame directory (default {DEFAULT_FPS})")
+    parser.add_argument("--center-h", type=float, help="Calibrated horizontal center (default: calibration.json)")
+    parser.add_argument("--center-v", type=float, help="Calibrated vertical center (default: calibration.json)")
+    parser.add_argument("--max-frames", type=int)
+    parser.add_argument("--no-roi", action="store_true", help="Always feed the full frame to the landmarker")
+    parser.add_argument("--no-gate", action="store_true", help="Run the landmarker on every frame (no presence gate)")
+    parser.add_argument("--mapping", action="store_true",
+                        help="Decide with the saved multi-point gaze mapping instead of the H/V box")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    center = None
+    if args.center_h is not None and args.center_v is not None:
+        center = (args.center_h, args.center_v)
+
+    report = replay(
+        args.source,
+        labels=load_labels(args.labels) if args.labels else None,
+        center=center,
+        fps=args.fps,
+        max_frames=args.max_frames,
+        face_roi=not args.no_roi,
+        presence_gate=PRESENCE_GATE and not args.no_gate,
+        mapping=load_saved_mapping() if args.mapping else None,
+    )
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Stage Profiler
+Records how long each step of a frame takes (camera read, presence gate,
+flip, color convert, landmark detection, feature math, decision, render) into
+fixed-size log-scale histograms: one perf_counter() pair and about a
+microsecond of bookkeeping per stage, and constant memory however long
+the session runs.
+
+Each stage is recorded from a single thread (read on the camera thread,
+gate/flip/convert/detect/features on the inference thread, decision/render on
+the stream loop), so no locking is needed.
+
+Dump the current numbers with SIGUSR1 (kill -USR1 <pid>) or the 'p' key in
+the alarm window; a summary is printed and saved at the end of the session.
+"""
+
+import math
+import os
+import signal
+import time
+
+import numpy as np
+
+from json_files import write_json_atomic
+
+STAGES = ("read", "gate", "flip", "convert", "detect", "features", "decision", "render")
+
+STAGE_PROFILE_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'stage_profile.json'))
+
+# Histogram bins: 10 us .. 10 s, 16 per decade (~15% wide), plus one bin either side for under/overflow
+MIN_SECONDS = 1e-5
+BINS_PER_DECADE = 16
+DECADES = 6
+NUM_BINS = BINS_PER_DECADE * DECADES + 2
+_LOG_MIN = math.log10(MIN_SECONDS)
+
+# Upper edge of each bin in seconds (the overflow bin reports as the largest edge)
+BIN_UPPER_EDGES = np.array(
+    [MIN_SECONDS] + [10 ** (_LOG_MIN + (i + 1) / BINS_PER_DECADE) for i in range(NUM_BINS - 1)]
+)
+
+
+class StageHistogram:
+    """Counts, total and max of one stage's durations"""
+    def __init__(self):
+        self.bins = np.zeros(NUM_BINS, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds < MIN_SECONDS:
+            index = 0
+        else:
+            index = min(int((math.log10(seconds) - _LOG_MIN) * BINS_PER_DECADE) + 1, NUM_BINS - 1)
+        self.bins[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper bin edge below which q percent of durations fall (seconds), or 0.0 if empty"""
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(self.count * q / 100.0)
+        index = int(np.searchsorted(np.cumsum(self.bins), max(rank, 1)))
+        return min(float(BIN_UPPER_EDGES[index]), self.max)
+
+    def summary(self):
+        """Dict of count and mean/p50/p95/p99/max in milliseconds"""
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean_ms": 1000 * float(mean),
+            "p50_ms": 1000 * self.percentile(50),
+            "p95_ms": 1000 * self.percentile(95),
+            "p99_ms": 1000 * self.percentile(99),
+            "max_ms": 1000 * float(self.max),
+        }
+
+
+class StageProfiler:
+    """One StageHistogram per stage"""
+    def __init__(self, stages=STAGES):
+        self.histograms = {stage: StageHistogram() for stage in stages}
+        self.started_at = time.monotonic()
+
+    def record(self, stage, seconds):
+        """Add one duration (seconds) to stage"""
+        self.histograms[stage].record(seconds)
+
+    def summary(self):
+        """{stage: StageHistogram.summary()} for every stage that has been recorded"""
+        return {stage: h.summary() for stage, h in self.histograms.items() if h.count}
+
+    def print_summary(self, title="STAGE TIMINGS"):
+        print_stage_summary(self.summary(), title, time.monotonic() - self.started_at)
+
+    def save(self, path=STAGE_PROFILE_FILE):
+        """Write the summary and raw histograms to path as JSON"""
+        data = {
+            "duration_seconds": time.monotonic() - self.started_at,
+            "bin_upper_edges_seconds": BIN_UPPER_EDGES.tolist(),
+            "stages": {stage: dict(h.summary(), bins=h.bins.tolist())
+                       for stage, h in self.histograms.items() if h.count},
+        }
+        write_json_atomic(data, path)
+
+    def install_signal_handler(self, signum=None):
+        """
+        Print the summary whenever the process receives signum (default SIGUSR1).
+
+        Only possible from the main thread, and on platforms that have the signal.
+
+        Returns:
+            True if the handler was installed
+        """
+        signum = signum if signum is not None else getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            return False
+        try:
+            signal.signal(signum, lambda *_: self.print_summary())
+        except ValueError:
+            return False  # Not the main thread
+        return True
+
+
+def print_stage_summary(summary, title="STAGE TIMINGS", duration=None):
+    """Print a StageProfiler.summary() dict as a table"""
+    header = f"📊 {title}" + (f" ({duration:.0f}s)" if duration is not None else "")
+    print("\n" + header)
+    print(f"{'Stage':<10}{'Count':>8}{'Mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'Max':>9}  (ms)")
+    for stage, s in summary.items():
+        print(f"{stage:<10}{s['count']:>8}{s['mean_ms']:>9.2f}{s['p50_ms']:>9.2f}{s['p95_ms']:>9.2f}"
+              f"{s['p99_ms']:>9.2f}{s['max_ms']:>9.2f}")
@@ -0,0 +1,307 @@
+"""
+Offline Threshold Sweep
+Replays recorded gaze logs (see gaze_log.py) through the look-away logic for
+a grid of MIN_LOOK_AWAY_DURATION, H_THRESHOLD, V_THRESHOLD and moving-average
+window settings, and scores each combination against the focus ratings the
+user gave in feedback_data/session_feedback.json.
+
+Everything is vectorized over samples and parameter combinations: smoothing
+is a cumulative-sum window, the H/V threshold pairs are broadcast against
+each other, and look-away runs are found with np.diff, so thousands of
+combinations over hours of data take seconds.
+
+Scoring: a combination is good when sessions rated as less focused show more
+look-away time. With 3+ rated sessions the score is the correlation between
+the focus rating and (1 - look-away fraction); with fewer it is how closely
+10 * (1 - look-away fraction) matches the rating.
+
+Usage (from backend/):
+    python -m eye_tracking.threshold_sweep
+    python -m eye_tracking.threshold_sweep session_data/*.gazelog --apply
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from eye_tracking.gaze_log import load_gaze_log, find_gaze_logs
+from eye_tracking.tracker_config import CONFIG_FILE, write_config_atomic
+
+FEEDBACK_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'feedback_data',
+                                             'session_feedback.json'))
+FEEDBACK_WINDOW = timedelta(minutes=30)  # Feedback must be given within this long after a session ends
+
+MIN_LOOK_AWAY_GRID = (1, 1.5, 2, 3, 4, 5, 7, 10, 15, 20)
+H_THRESHOLD_GRID = tuple(np.round(np.arange(0.02, 0.0901, 0.01), 3))
+V_THRESHOLD_GRID = tuple(np.round(np.arange(0.02, 0.0901, 0.01), 3))
+WINDOW_GRID = (0.1, 0.2, 0.33, 0.5, 0.75, 1.0)  # Moving-average seconds
+
+MIN_CORRELATION_SESSIONS = 3
+
+
+# ========================
+# DATA
+# ========================
+
+def load_feedback(path=FEEDBACK_FILE):
+    """[(datetime, focus_rating)] sorted by time"""
+    try:
+        with open(path, 'r') as f:
+            entries = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+    feedback = []
+    for entry in entries if isinstance(entries, list) else []:
+        try:
+            feedback.append((datetime.fromisoformat(entry["timestamp"]), float(entry["focus_rating"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return sorted(feedback)
+
+
+def session_end(header):
+    ended = header.get("ended_at") or header.get("started_at")
+    return datetime.fromisoformat(ended) if ended else None
+
+
+def match_rating(ended, feedback, other_ends=()):
+    """
+    Focus rating of the first feedback given after a session ended (within
+    FEEDBACK_WINDOW), unless another session ended in between - that
+    feedback then belongs to the later session.
+    """
+    if ended is None:
+        return None
+    for when, rating in feedback:
+        if ended <= when <= ended + FEEDBACK_WINDOW:
+            if any(ended < other <= when for other in other_ends):
+                return None
+            return rating
+    return None
+
+
+class SessionLog:
+    """The valid (face found) samples of one recorded session"""
+    def __init__(self, path, header, columns, rating):
+        self.path = path
+        self.rating = rating
+        meta = header.get("meta", {})
+        self.center_h = meta.get("center_h", 0.5)
+        self.center_v = meta.get("center_v", 0.45)
+        self.has_mapping = bool(meta.get("mapping"))
+        valid = ~np.isnan(columns["raw_h"])
+        self.t = columns["t"][valid].astype(np.float64)
+        self.h = columns["raw_h"][valid].astype(np.float64)
+        self.v = columns["raw_v"][valid].astype(np.float64)
+        # Session length for the look-away fraction: the whole log, not just the face-found part
+        self.duration = float(columns["t"][-1]) if len(columns["t"]) else 0.0
+
+
+def load_sessions(paths, feedback):
+    logs = []
+    for path in paths:
+        try:
+            header, columns = load_gaze_log(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Skipping {path}: {e}")
+            continue
+        logs.append((path, header, columns, session_end(header)))
+
+    ends = [end for _, _, _, end in logs if end is not None]
+    sessions = []
+    for path, header, columns, end in logs:
+        rating = match_rating(end, feedback, ends)
+        if rating is None:
+            print(f"⚠️  Skipping {os.path.basename(path)}: no focus rating after this session")
+            continue
+        session = SessionLog(path, header, columns, rating)
+        if len(session.t) < 2 or session.duration <= 0:
+            continue
+        sessions.append(session)
+    return sessions
+
+
+# ========================
+# VECTORIZED EVALUATION
+# ========================
+
+def moving_average(t, x, window):
+    """Vectorized MovingAverageFilter: mean of samples with timestamp > t - window (always including t)"""
+    cs = np.concatenate(([0.0], np.cumsum(x)))
+    end = np.arange(1, len(t) + 1)
+    start = np.minimum(np.searchsorted(t, t - window, side='right'), end - 1)
+    return (cs[end] - cs[start]) / (end - start)
+
+
+def look_away_time(t, off_screen, min_look_aways):
+    """
+    Total look-away seconds per (threshold combination, min duration).
+
+    A look away is a run of consecutive off-screen samples; it counts once it
+    lasts min_look_away (the time from its first to its last off-screen
+    sample), and its length is measured until the gaze returns.
+
+    Args:
+        t: (N,) sample times
+        off_screen: (K, N) bool, one row per threshold combination
+        min_look_aways: (M,) durations
+
+    Returns:
+        (M, K) seconds
+    """
+    k, n = off_screen.shape
+    padded = np.zeros((k, n + 2), dtype=np.int8)
+    padded[:, 1:-1] = off_screen
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)  # Same row order as starts: one end per start
+    observed = t[ends - 1] - t[starts]
+    # Until the next on-screen sample (or the last sample, for a run still going at the end)
+    returned = t[np.minimum(ends, n - 1)] - t[starts]
+
+    result = np.zeros((len(min_look_aways), k))
+    for i, min_look_away in enumerate(min_look_aways):
+        counted = observed >= min_look_away
+        result[i] = np.bincount(rows[counted], weights=returned[counted], minlength=k)
+    return result
+
+
+def sweep_session(session, windows, h_thresholds, v_thresholds, min_look_aways):
+    """Look-away fraction for every combination, shape (windows, min_look_aways, h, v)"""
+    h_thr = np.asarray(h_thresholds)[:, None, None]
+    v_thr = np.asarray(v_thresholds)[None, :, None]
+    result = np.zeros((len(windows), len(min_look_aways), len(h_thresholds), len(v_thresholds)))
+    for w, window in enumerate(windows):
+        dh = np.abs(moving_average(session.t, session.h, window) - session.center_h)
+        dv = np.abs(moving_average(session.t, session.v, window) - session.center_v)
+        off_screen = (dh[None, None, :] >= h_thr) | (dv[None, None, :] >= v_thr)
+        seconds = look_away_time(session.t, off_screen.reshape(-1, len(session.t)), min_look_aways)
+        result[w] = seconds.reshape(len(min_look_aways), len(h_thresholds), len(v_thresholds))
+    return result / session.duration
+
+
+def score(fractions, ratings):
+    """
+    Higher is better. fractions is (sessions, combos); ratings is (sessions,).
+
+    Returns:
+        (scores, method)
+    """
+    focus = 1.0 - np.clip(fractions, 0.0, 1.0)
+    if len(ratings) >= MIN_CORRELATION_SESSIONS and np.std(ratings) > 0:
+        f = focus - focus.mean(axis=0)
+        r = ratings - ratings.mean()
+        denom = np.sqrt((f ** 2).sum(axis=0) * (r ** 2).sum())
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = np.where(denom > 0, (f * r[:, None]).sum(axis=0) / denom, -1.0)
+        return corr, "correlation"
+    return -np.sqrt(((10 * focus - ratings[:, None]) ** 2).mean(axis=0)), "-rms error"
+
+
+def sweep(sessions, windows=WINDOW_GRID, h_thresholds=H_THRESHOLD_GRID, v_thresholds=V_THRESHOLD_GRID,
+          min_look_aways=MIN_LOOK_AWAY_GRID, top=5):
+    """
+    Evaluate the whole grid over all sessions.
+
+    Returns:
+        Dict with the best combinations, scoring method, combination count and timing
+    """
+    start = time.perf_counter()
+    shape = (len(windows), len(min_look_aways), len(h_thresholds), len(v_thresholds))
+    fractions = np.stack([sweep_session(s, windows, h_thresholds, v_thresholds, min_look_aways).reshape(-1)
+                          for s in sessions])
+    ratings = np.array([s.rating for s in sessions])
+    scores, method = score(fractions, ratings)
+
+    best = []
+    for flat in np.argsort(-scores, kind="stable")[:top]:
+        w, m, h, v = np.unravel_index(flat, shape)
+        best.append({
+            "smoothing_window": float(windows[w]),
+            "min_look_away": float(min_look_aways[m]),
+            "h_threshold": float(h_thresholds[h]),
+            "v_threshold": float(v_thresholds[v]),
+            "score": float(scores[flat]),
+            "look_away_percent": [round(100 * float(x), 1) for x in fractions[:, flat]],
+        })
+    return {
+        "combinations": int(np.prod(shape)),
+        "sessions": len(sessions),
+        "samples": int(sum(len(s.t) for s in sessions)),
+        "hours": sum(s.duration for s in sessions) / 3600,
+        "method": method,
+        "seconds": time.perf_counter() - start,
+        "ratings": ratings.tolist(),
+        "best": best,
+    }
+
+
+def recommended_config(result):
+    """config.json values for the best combination"""
+    best = result["best"][0]
+    return {
+        "MIN_LOOK_AWAY_DURATION": best["min_look_away"],
+        "H_THRESHOLD": best["h_threshold"],
+        "V_THRESHOLD": best["v_threshold"],
+    }
+
+
+def apply_config(values, path=CONFIG_FILE):
+    """Merge values into config.json, keeping every other key"""
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        config = {}
+    config.update(values)
+    write_config_atomic(config, path)
+
+
+def print_result(result):
+    print("\n" + "=" * 60)
+    print("📊 THRESHOLD SWEEP")
+    print("=" * 60)
+    print(f"{result['combinations']} combinations x {result['sessions']} sessions "
+          f"({result['samples']} samples, {result['hours']:.1f} h) in {result['seconds']:.2f}s")
+    print(f"Ratings: {result['ratings']} - scored by {result['method']}")
+    for i, b in enumerate(result["best"], 1):
+        print(f"{i}. MIN_LOOK_AWAY={b['min_look_away']}s H={b['h_threshold']} V={b['v_threshold']} "
+              f"window={b['smoothing_window']}s -> score {b['score']:.3f}, look away % {b['look_away_percent']}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune look-away thresholds on recorded gaze logs")
+    parser.add_argument("logs", nargs="*", help=".gazelog files (default: everything in session_data/)")
+    parser.add_argument("--feedback", default=FEEDBACK_FILE, help="session_feedback.json path")
+    parser.add_argument("--json", help="Also write the full result to this file")
+    parser.add_argument("--apply", action="store_true", help="Write the recommendation to config.json")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.logs or find_gaze_logs(), load_feedback(args.feedback))
+    if not sessions:
+        print("❌ No gaze logs with a matching focus rating (record with RECORD_GAZE_LOG = True)")
+        return
+    if any(s.has_mapping for s in sessions):
+        print("⚠️  Some sessions used multi-point calibration; H/V thresholds only apply to center calibration")
+
+    result = sweep(sessions)
+    result["recommended_config"] = recommended_config(result)
+    print_result(result)
+    print(f"✅ Recommended config: {json.dumps(result['recommended_config'])}")
+    print(f"   SMOOTHING_PARAMS = {{\"window\": {result['best'][0]['smoothing_window']}}}  (eye_tracker.py)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.apply:
+        apply_config(result["recommended_config"])
+        print(f"✅ Written to {CONFIG_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Tracker Configuration
+Reads the tracker thresholds from backend/config.json and watches the file
+so values tuned by the feedback loop (amplitude_response.py) reach a running
+stream without a restart.
+"""
+
+import json
+import os
+from collections import namedtuple
+
+from json_files import write_json_atomic
+
+CONFIG_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'config.json'))
+
+TrackerConfig = namedtuple(
+    "TrackerConfig",
+    ["min_look_away", "alarm_duration", "h_threshold", "v_threshold", "target_fps"]
+)
+
+# config.json key -> (TrackerConfig field, validator)
+CONFIG_KEYS = {
+    'MIN_LOOK_AWAY_DURATION': ("min_look_away", lambda x: 0 <= x <= 600),
+    'ALARM_DURATION': ("alarm_duration", lambda x: 0 < x <= 3600),
+    'H_THRESHOLD': ("h_threshold", lambda x: 0 < x < 1),
+    'V_THRESHOLD': ("v_threshold", lambda x: 0 < x < 1),
+    'TARGET_FPS': ("target_fps", lambda x: 1 <= x <= 120),
+}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_tracker_config(data, defaults):
+    """
+    Build a TrackerConfig from a config.json dict, keeping the default for any
+    missing or invalid value. TARGET_FPS may also be null for "every frame".
+    """
+    values = defaults._asdict()
+    for key, (field, valid) in CONFIG_KEYS.items():
+        if key not in data:
+            continue
+        value = data[key]
+        if field == "target_fps" and value is None:
+            values[field] = None
+        elif _is_number(value) and valid(value):
+            values[field] = value
+        else:
+            print(f"⚠️  Ignoring invalid {key} in config.json: {value!r}")
+    return TrackerConfig(**values)
+
+
+def load_tracker_config(defaults, path=CONFIG_FILE):
+    """Current config from path, or defaults if it is missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return defaults
+    if not isinstance(data, dict):
+        return defaults
+    return parse_tracker_config(data, defaults)
+
+
+class ConfigWatcher:
+    """
+    Cheap change detection for config.json: one os.stat() every poll_interval
+    seconds, and a re-parse only when the modification time or size changes.
+    """
+    def __init__(self, defaults, path=CONFIG_FILE, poll_interval=2.0):
+        self.defaults = defaults
+        self.path = path
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self._next_poll = 0.0
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self, now):
+        """
+        Check for changes at monotonic time now.
+
+        Returns:
+            The new TrackerConfig if the file changed since the last poll, otherwise None
+        """
+        if now < self._next_poll:
+            return None
+        self._next_poll = now + self.poll_interval
+
+        signature = self._stat()
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        self.reloads += 1
+        return load_tracker_config(self.defaults, self.path)
+
+
+def write_config_atomic(config, path=CONFIG_FILE):
+    """Write config.json so a watching tracker never reads a partial file"""
+    write_json_atomic(config, path)
@@ -231,15 +231,15 @@ class FeedbackForm:
     def trigger_amplitude_analysis(self, focus_rating):
         """Trigger amplitude_response.py with the human focus rating"""
         try:
-            # feedback_form.py is in backend/, amplitude_response.py is in backend/amplitude_service/
+            # Run as a module from backend/ so it can import the shared backend helpers
             script_dir = os.path.dirname(os.path.abspath(__file__))
-            amplitude_path = os.path.join(script_dir, 'amplitude_service', 'amplitude_response.py')
-            
+            module = 'amplitude_service.amplitude_response'
+
             # Pass focus_rating as a command line argument
-            subprocess.Popen([sys.executable, amplitude_path, str(focus_rating)])
+            subprocess.Popen([sys.executable, '-m', module, str(focus_rating)], cwd=script_dir)
 
             print(f"Triggered amplitude analysis with focus_rating={focus_rating}")
-            print(f"📂 Amplitude path: {amplitude_path}")
+            print(f"📂 Amplitude module: {module} (in {script_dir})")
         except Exception as e:
             print(f"Error triggering amplitude analysis: {e}")
 
@@ -0,0 +1,30 @@
+"""
+JSON File Helpers
+Shared by everything that rewrites a JSON file another process may be
+reading (config.json, calibration.json, stage_profile.json).
+"""
+
+import json
+import os
+import tempfile
+
+
+def write_json_atomic(data, path):
+    """
+    Write data as JSON via a temp file and rename so readers never see a
+    partial file. Each call gets its own temp file, so concurrent writers
+    of the same path don't clobber each other's half-written output - the
+    last rename wins.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; keep the usual permissions of these files
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
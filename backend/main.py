@@ -3,10 +3,12 @@ import threading
 import subprocess
 import tkinter as tk
 import os
-import json
 from datetime import datetime
-from screen_capture.screen_capture import capture_binary
-from eye_tracking.eye_tracker import calibrate_eye_tracker, run_eye_tracker_stream
+from screen_capture.screen_capture import MultiScreenCapture, ScreenGrabber
+from eye_tracking.eye_tracker import TrackerSession, load_or_calibrate, run_eye_tracker_stream
+from eye_tracking.events import EventBus, forward_to_metrics, log_event
+from eye_tracking.stage_profiler import print_stage_summary
+from eye_tracking.tracker_config import write_config_atomic
 from orchestrate_webhook import send_to_webhook
 from user_onboarding import TaskInputDialog
 from amplitude_service.amplitude_service import track_session_start, track_session_end, track_tab_switch, track_look_away, generate_session_id
@@ -34,14 +36,14 @@ class SessionMetrics:
         track_tab_switch(session_id=self.session_id)
         print(f"📊 Tab switches: {self.tab_switch_count}")
     
-    def start_look_away(self):
-        """Mark the start of a look away event"""
-        self.last_look_away_start = time.time()
+    def start_look_away(self, timestamp=None):
+        """Mark the start of a look away event (timestamp defaults to now)"""
+        self.last_look_away_start = timestamp or time.time()
     
-    def end_look_away(self):
-        """Mark the end of a look away event and track it"""
+    def end_look_away(self, timestamp=None):
+        """Mark the end of a look away event and track it (timestamp defaults to now)"""
         if self.last_look_away_start:
-            duration = time.time() - self.last_look_away_start
+            duration = (timestamp or time.time()) - self.last_look_away_start
             self.look_away_count += 1
             self.total_look_away_duration += duration
             track_look_away(session_id=self.session_id, duration_seconds=duration)
@@ -64,11 +66,19 @@ def run_screen_capture():
     print(f"📊 Capturing every {CAPTURE_INTERVAL} seconds")
     print("-" * 50)
 
+    grabber = ScreenGrabber()  # Owned by this thread; keeps the display connection open between captures
+    # Every monitor goes into each upload; unchanged screens are neither encoded nor uploaded
+    capture = MultiScreenCapture(grabber)
     while True:
         try:
-            image_bytes = capture_binary()
-            print(f"✅ Screenshot sent {USER_TASK}")
-            send_to_webhook(image_bytes, USER_TASK)
+            now = time.monotonic()
+            images = capture.capture(now)
+            if images is None:
+                print(f"💤 Screen unchanged, upload skipped ({capture.skipped} so far)")
+            else:
+                print(f"✅ Screenshot sent {USER_TASK}")
+                send_to_webhook(images, USER_TASK, capture.encoder.mime_type, capture.encoder.filename)
+                capture.mark_sent(now)
 
         except Exception as e:
             print(f"❌ Screen capture error: {e}")
@@ -97,8 +107,7 @@ def ensure_config_file():
             'last_updated': datetime.utcnow().isoformat()
         }
         try:
-            with open(config_file, 'w') as f:
-                json.dump(default_config, f, indent=2)
+            write_config_atomic(default_config, config_file)
             print(f"✅ Created default config file: {config_file}")
         except IOError as e:
             print(f"⚠️  Warning: Could not create config file: {e}")
@@ -136,8 +145,11 @@ def main():
     time.sleep(2)
     
     # STEP 2: Calibrate eye tracker
+    # One session (model + camera) is kept warm from calibration through streaming.
+    # A saved calibration for this camera is reused if the user's gaze still matches it.
     print("\n📍 STEP 2: Eye Tracker Calibration")
-    center_h, center_v = calibrate_eye_tracker()
+    tracker_session = TrackerSession().start()
+    center_h, center_v, gaze_mapping = load_or_calibrate(tracker_session)
     
     print(f"\n✅ Calibration complete! Values: H={center_h:.3f}, V={center_v:.3f}")
     print("\n" + "=" * 50)
@@ -174,15 +186,23 @@ def main():
     print("\n🎯 System fully operational!")
     print("Press 'Q' in the eye tracker window to stop\n")
     
+    # Gaze events are handled on the bus's own thread so Amplitude calls never stall the tracker
+    gaze_events = EventBus()
+    gaze_events.subscribe(forward_to_metrics(metrics))
+    gaze_events.subscribe(log_event)
+    gaze_events.start()
+
+    tracker_stats = None
     try:
-        # TODO: Modify run_eye_tracker_stream to accept callbacks for:
-        # - metrics.increment_tab_switch() when tab switches detected
-        # - metrics.start_look_away() when user looks away
-        # - metrics.end_look_away() when user looks back
-        run_eye_tracker_stream(center_h, center_v)
+        # TODO: Call metrics.increment_tab_switch() when tab switches are detected
+        tracker_stats = run_eye_tracker_stream(center_h, center_v, session=tracker_session, events=gaze_events,
+                               mapping=gaze_mapping)
     except KeyboardInterrupt:
         print("\n\n🛑 Shutting down...")
     finally:
+        tracker_session.close()
+        gaze_events.stop()
+
         # Track session end before cleanup
         session_duration = metrics.get_session_duration()
         track_session_end(
@@ -198,6 +218,23 @@ def main():
         print(f"Tab Switches: {metrics.tab_switch_count}")
         print(f"Look Aways: {metrics.look_away_count}")
         print(f"Total Look Away Time: {metrics.total_look_away_duration:.1f}s")
+        if tracker_stats:
+            print(f"Gaze Sampling: {tracker_stats['average_fps']:.1f} fps average "
+                  f"(target {tracker_stats['target_fps']})")
+            if tracker_stats['estimated_runs_saved_percent'] is not None:
+                print(f"Landmarker Runs Saved: ~{tracker_stats['estimated_runs_saved_percent']:.0f}%")
+            heatmap = tracker_stats['heatmap']
+            if heatmap['peak_offset'] is not None:
+                print(f"Gaze Focus: peak at H{heatmap['peak_offset'][0]:+.3f} V{heatmap['peak_offset'][1]:+.3f} "
+                      f"from center over {heatmap['tracked_seconds']:.0f}s tracked")
+                if heatmap['inside_threshold_percent'] is not None:
+                    print(f"Gaze Inside Threshold Box: {heatmap['inside_threshold_percent']:.0f}%")
+                if heatmap['ascii']:
+                    print(heatmap['ascii'])
+                if heatmap['file']:
+                    print(f"Gaze Heatmap: {heatmap['file']}")
+            if tracker_stats['stage_timings']:
+                print_stage_summary(tracker_stats['stage_timings'], "Frame Stage Timings")
         print("=" * 50)
     
     print("\n👋 System stopped")
@@ -1,3 +1,4 @@
+import os
 import requests
 import time
 
@@ -9,13 +10,23 @@ WEBHOOK_URL = "http://localhost:5678/webhook/df35d481-1743-43ee-a4ed-6b478dd5763
 BUDDY_API_URL = "http://127.0.0.1:5000/data"  # Buddy's Flask endpoint
 TIMEOUT = 15
 
-def send_to_webhook(image_bytes: bytes, user_task: str):
-    files = {
-        "file": ("screenshot.jpg", image_bytes, "image/jpeg")
-    }
+def send_to_webhook(image_bytes, user_task: str, mime_type: str = "image/jpeg",
+                    filename: str = "screenshot.jpg"):
+    """
+    Post the screen to n8n and pass its verdict on to Buddy.
+
+    image_bytes is one encoded image, or a list of them (one per screen) sent
+    in the same request as fields file, file_1, file_2, ...
+    """
+    parts = image_bytes if isinstance(image_bytes, (list, tuple)) else [image_bytes]
+    stem, ext = os.path.splitext(filename)
+    files = {"file": (filename, parts[0], mime_type)}
+    for i, part in enumerate(parts[1:], 1):
+        files[f"file_{i}"] = (f"{stem}_{i}{ext}", part, mime_type)
     data = {
         "current_task": user_task,
-        "timestamp": int(time.time())
+        "timestamp": int(time.time()),
+        "screen_count": len(parts)
     }
 
     response = requests.post(
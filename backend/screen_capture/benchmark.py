@@ -0,0 +1,258 @@
+"""
+Screen Capture Benchmark
+Per-capture cost of the screenshot path. Run it under a virtual display so
+the numbers don't depend on what is on screen:
+
+    xvfb-run -s "-screen 0 1920x1080x24" python -m screen_capture.benchmark grab
+
+Modes:
+    grab    New mss.mss() per capture (the old capture_binary) vs a persistent ScreenGrabber
+    encode  Resize filter x codec settings on synthetic 1080p/4K screens (no display needed):
+            time, bytes and PSNR against a LANCZOS-resized lossless reference
+    alloc   Peak Python allocation per encode (tracemalloc) and time: the old .rgb + frombytes
+            path vs the zero-copy BGRA path, on synthetic 1080p/4K grabs (no display needed)
+    monitors  Per-cycle cost of multi-screen capture against the single-monitor path: encoding
+              MONITOR_SCREENS synthetic 1080p screens serially vs on the pool (no display needed),
+              then live grab+encode cycles on the current display if there is one. Xvfb gives
+              mss a single monitor, so run the live half on a real multi-monitor desktop
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+
+import mss
+import numpy as np
+from mss.screenshot import ScreenShot
+from PIL import Image
+
+from screen_capture.screen_capture import (ScreenGrabber, ScreenEncoder, MultiScreenCapture, capture_binary,
+                                           encode_screenshot, DEFAULT_ENCODER)
+
+
+def _time_calls(fn, runs, warmup=3):
+    """Per-call wall times (ms) of fn() after a few warmup calls"""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(1000 * (time.perf_counter() - start))
+    return times
+
+
+def _print_rows(title, rows):
+    print("\n" + "=" * 64)
+    print(f"📊 {title}")
+    print("=" * 64)
+    print(f"{'Path':<36}{'Mean (ms)':>10}{'Median':>9}{'p95':>9}")
+    for name, times in rows:
+        p95 = sorted(times)[max(0, int(len(times) * 0.95) - 1)]
+        print(f"{name:<36}{statistics.mean(times):>10.2f}{statistics.median(times):>9.2f}{p95:>9.2f}")
+    print("=" * 64)
+
+
+# ========================
+# GRAB: PER-CALL vs PERSISTENT CONNECTION
+# ========================
+
+def grab_per_call():
+    """The old capture_binary(): open mss, enumerate monitors, grab, close"""
+    with mss.mss() as sct:
+        return sct.grab(sct.monitors[1])
+
+
+def bench_grab(runs):
+    with ScreenGrabber() as grabber:
+        rows = [
+            ("grab, new mss per call", _time_calls(grab_per_call, runs)),
+            ("grab, persistent ScreenGrabber", _time_calls(grabber.grab, runs)),
+            ("grab+encode, new mss per call", _time_calls(lambda: encode_screenshot(grab_per_call()), runs)),
+            ("grab+encode, persistent", _time_calls(lambda: encode_screenshot(grabber.grab()), runs)),
+        ]
+        size = grabber.monitor["width"], grabber.monitor["height"]
+    _print_rows(f"SCREEN GRAB ({size[0]}x{size[1]}, {runs} runs)", rows)
+
+
+# ========================
+# ENCODE: RESIZE FILTER x CODEC
+# ========================
+
+ENCODE_RESOLUTIONS = ((1920, 1080), (3840, 2160))
+ENCODE_SETTINGS = (
+    # (label, resize, format, optimize) - the first row is the old capture_binary()
+    ("lanczos + jpeg optimize", "lanczos", "jpeg", True),
+    ("lanczos + jpeg", "lanczos", "jpeg", False),
+    ("bilinear + jpeg", "bilinear", "jpeg", False),
+    ("box + jpeg", "box", "jpeg", False),
+    ("reduce + jpeg", "reduce", "jpeg", False),
+    ("reduce + jpeg optimize", "reduce", "jpeg", True),
+    ("reduce + webp", "reduce", "webp", False),
+    ("box + webp", "box", "webp", False),
+)
+
+
+def synthetic_screen(width, height, seed=0):
+    """A desktop-like RGB frame: flat sidebar, lines of dark "text" on white, and a photo-like panel"""
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), 250, dtype=np.uint8)
+    img[:, :width // 6] = (43, 45, 48)  # Sidebar
+    img[:height // 20] = (60, 64, 72)  # Title bar
+
+    # Text: short dark runs on a regular line grid
+    line_h = max(8, height // 60)
+    glyph_w = max(3, width // 400)
+    for top in range(height // 10, height * 2 // 3, line_h * 2):
+        for left in range(width // 5, width * 3 // 5, glyph_w * 2):
+            if rng.random() < 0.8:
+                img[top:top + line_h, left:left + glyph_w] = rng.integers(0, 80)
+
+    # Photo panel: smooth gradients plus noise
+    y0, x0 = height * 2 // 3, width * 3 // 5
+    yy, xx = np.mgrid[0:height - y0, 0:width - x0]
+    panel = np.stack([128 + 100 * np.sin(xx / 37.0), 128 + 100 * np.cos(yy / 23.0),
+                      128 + 60 * np.sin((xx + yy) / 51.0)], axis=-1)
+    panel += rng.normal(0, 12, panel.shape)
+    img[y0:, x0:] = np.clip(panel, 0, 255).astype(np.uint8)
+    return Image.fromarray(img, "RGB")
+
+
+def psnr(a, b):
+    mse = np.mean((np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def bench_encode(runs):
+    for width, height in ENCODE_RESOLUTIONS:
+        screen = synthetic_screen(width, height)
+        reference = ScreenEncoder(resize="lanczos").resize(screen)
+
+        print("\n" + "=" * 80)
+        print(f"📊 SCREEN ENCODE ({width}x{height} -> {reference.width}x{reference.height}, {runs} runs)")
+        print("=" * 80)
+        print(f"{'Setting':<26}{'Resize ms':>10}{'Encode ms':>10}{'Total ms':>10}{'Bytes':>9}{'PSNR dB':>9}")
+        for label, resize, fmt, optimize in ENCODE_SETTINGS:
+            encoder = ScreenEncoder(resize=resize, fmt=fmt, optimize=optimize)
+            resized = encoder.resize(screen)
+            resize_ms = statistics.median(_time_calls(lambda: encoder.resize(screen), runs))
+            encode_ms = statistics.median(_time_calls(lambda: encoder.encode(resized), runs))
+            data = encoder.encode(resized)
+            decoded = Image.open(BytesIO(data)).convert("RGB")
+            print(f"{label:<26}{resize_ms:>10.2f}{encode_ms:>10.2f}{resize_ms + encode_ms:>10.2f}"
+                  f"{len(data):>9}{psnr(decoded, reference):>9.1f}")
+        print("=" * 80)
+
+
+# ========================
+# ALLOC: .rgb + frombytes vs ZERO-COPY BGRA
+# ========================
+
+def encode_via_rgb(screenshot, encoder=DEFAULT_ENCODER):
+    """The previous encode_screenshot(): full-size RGB bytes from mss, copied into a PIL image"""
+    img = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
+    return encoder(img)
+
+
+def synthetic_grab(width, height):
+    """BGRA bytes of a synthetic screen, as mss would return them"""
+    rgb = np.asarray(synthetic_screen(width, height))
+    bgra = np.empty((height, width, 4), dtype=np.uint8)
+    bgra[..., :3] = rgb[..., ::-1]
+    bgra[..., 3] = 255
+    return bytearray(bgra.tobytes())
+
+
+def _peak_allocation(fn):
+    """Peak bytes allocated through Python's allocators while fn() runs"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - start
+
+
+def bench_alloc(runs):
+    print("\n" + "=" * 72)
+    print(f"📊 SCREENSHOT ENCODE ALLOCATIONS ({runs} runs)")
+    print("=" * 72)
+    print(f"{'Grab':<12}{'Path':<22}{'Peak alloc (MB)':>16}{'Median ms':>11}{'Bytes out':>11}")
+    for width, height in ENCODE_RESOLUTIONS:
+        raw = synthetic_grab(width, height)
+        for label, encode in (("rgb + frombytes", encode_via_rgb), ("zero-copy BGRA", encode_screenshot)):
+            # A fresh ScreenShot per call: mss caches .rgb on the object
+            grab = lambda: ScreenShot.from_size(raw, width, height)
+            peak = _peak_allocation(lambda: encode(grab()))
+            times = _time_calls(lambda: encode(grab()), runs)
+            size = len(encode(grab()))
+            print(f"{width}x{height:<7}{label:<22}{peak / 1e6:>16.1f}{statistics.median(times):>11.2f}{size:>11}")
+    print("=" * 72)
+    print("tracemalloc sees Python-level buffers (mss .rgb bytes); Pillow's own image memory is")
+    print("allocated in C and not included.")
+
+
+# ========================
+# MONITORS: SINGLE SCREEN vs MULTI-SCREEN CYCLES
+# ========================
+
+MONITOR_SCREENS = 2
+MONITOR_SETTINGS = (
+    # (label, MultiScreenCapture arguments)
+    ("composite, 1 worker", {"layout": "composite", "workers": 1}),
+    ("composite, pool", {"layout": "composite"}),
+    ("multipart, 1 worker", {"layout": "multipart", "workers": 1}),
+    ("multipart, pool", {"layout": "multipart"}),
+)
+
+
+def bench_monitors(runs):
+    width, height = ENCODE_RESOLUTIONS[0]
+    raws = [synthetic_grab(width, height) for _ in range(MONITOR_SCREENS)]
+    shots = lambda: [ScreenShot.from_size(raw, width, height) for raw in raws]
+    rows = [("1 screen, encode_screenshot", _time_calls(lambda: encode_screenshot(shots()[0]), runs))]
+    for label, kwargs in MONITOR_SETTINGS:
+        with MultiScreenCapture(**kwargs) as capture:  # render() only; the thread grabber never opens
+            rows.append((f"{MONITOR_SCREENS} screens, {label}", _time_calls(lambda: capture.render(shots()), runs)))
+    _print_rows(f"MULTI-SCREEN ENCODE ({MONITOR_SCREENS}x synthetic {width}x{height}, {runs} runs)", rows)
+
+    try:
+        grabber = ScreenGrabber()
+        grabber.grab()
+    except Exception as e:
+        print(f"⚠️  No display to grab, live cycles skipped: {e}")
+        return
+    with grabber:
+        count = len(grabber.monitors("all"))
+        rows = [("primary, capture_binary", _time_calls(lambda: capture_binary(grabber), runs))]
+        for label, kwargs in MONITOR_SETTINGS + (("active window", {"active_window": True}),):
+            with MultiScreenCapture(grabber, monitors="all", **kwargs) as capture:
+                rows.append((f"all, {label}", _time_calls(capture.capture, runs)))
+                if capture.window_misses:
+                    print(f"⚠️  Active window not found in {capture.window_misses} cycles (fell back to monitors)")
+    _print_rows(f"LIVE CAPTURE CYCLE ({count} monitor(s), {runs} runs)", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the screen capture path")
+    parser.add_argument("mode", choices=["grab", "encode", "alloc", "monitors"])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.mode == "grab":
+        bench_grab(args.runs)
+    elif args.mode == "encode":
+        bench_encode(args.runs)
+    elif args.mode == "alloc":
+        bench_alloc(args.runs)
+    elif args.mode == "monitors":
+        bench_monitors(args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
+import subprocess
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from PIL import Image
 import mss
+import mss.exception
+import numpy as np
 
 from orchestrate_webhook import send_to_webhook
 
@@ -10,40 +16,437 @@ from orchestrate_webhook import send_to_webhook
 CAPTURE_INTERVAL = 5            # seconds
 JPEG_QUALITY = 75               # 40–70 recommended
 MAX_WIDTH = 512                # downscale for cost/perf
+RESIZE_METHOD = "box"           # "box", "reduce" (integer box shrink + bilinear; faster, blurrier), "bilinear" or "lanczos"
+ENCODE_FORMAT = "jpeg"          # "jpeg" or "webp"
+JPEG_OPTIMIZE = False           # extra Huffman pass: ~1-3% smaller, noticeably slower
+LAYOUT_CHECK_SECONDS = 60       # re-enumerate monitors this often (and after any grab error)
+
+CHANGE_GRID_WIDTH = 128         # sample points per row for change detection
+CHANGE_PIXEL_THRESHOLD = 24     # 0-255 brightness step that counts a sample point as changed
+CHANGE_MIN_FRACTION = 0.005     # share of changed points that counts as a new screen
+MAX_STALENESS = 60              # seconds; upload even an unchanged screen this often
+
+CAPTURE_MONITORS = "all"        # "primary", "all", or a list of mss monitor indices (1 = primary)
+MULTI_MONITOR_LAYOUT = "composite"  # "composite" (one side-by-side image) or "multipart" (one image per screen)
+CAPTURE_ACTIVE_WINDOW = False   # grab only the focused window's rectangle when it can be found
+ENCODE_WORKERS = 4              # threads for per-screen resize/encode
 
 # =========================================
 
 
-def capture_binary() -> bytes:
-    """Capture full screen and return JPEG bytes."""
-    with mss.mss() as sct:
-        monitor = sct.monitors[1]  # Primary monitor
-        screenshot = sct.grab(monitor)
+class ScreenGrabber:
+    """
+    Long-lived mss connection for one thread.
 
-        img = Image.frombytes(
-            "RGB",
-            screenshot.size,
-            screenshot.rgb
-        )
+    Opening mss connects to the display and enumerates the monitors, which
+    costs more than the grab itself at our capture rate, so the connection
+    is kept and reopened only every LAYOUT_CHECK_SECONDS (to pick up
+    plugged/unplugged displays) or after a failed grab.
 
-        # Resize while preserving aspect ratio
-        if img.width > MAX_WIDTH:
-            ratio = MAX_WIDTH / img.width
-            img = img.resize(
-                (MAX_WIDTH, int(img.height * ratio)),
-                Image.LANCZOS
-            )
+    mss handles must stay on the thread that created them - create one
+    grabber per capture thread.
+    """
+    def __init__(self, monitor_index=1, layout_check_seconds=LAYOUT_CHECK_SECONDS):
+        self.monitor_index = monitor_index
+        self.layout_check_seconds = layout_check_seconds
+        self.sct = None
+        self.monitor = None
+        self.opens = 0
+        self._opened_at = 0.0
+
+    def _open(self):
+        self.close()
+        self.sct = mss.mss()
+        monitors = self.sct.monitors
+        # Fall back to the whole virtual screen if the chosen monitor went away
+        self.monitor = monitors[self.monitor_index] if self.monitor_index < len(monitors) else monitors[0]
+        self._opened_at = time.monotonic()
+        self.opens += 1
+
+    def _ensure_open(self):
+        if self.sct is None or time.monotonic() - self._opened_at >= self.layout_check_seconds:
+            self._open()
+
+    def grab(self, region=None):
+        """
+        Grab the monitor, or region (an mss {"left", "top", "width", "height"} dict).
+
+        Returns:
+            mss ScreenShot (BGRA pixels)
+        """
+        self._ensure_open()
+        try:
+            return self.sct.grab(region or self.monitor)
+        except mss.exception.ScreenShotError:
+            # Layout or display changed under us - reconnect once and retry
+            self._open()
+            return self.sct.grab(region or self.monitor)
+
+    def monitors(self, selection="all"):
+        """
+        mss monitor dicts for a selection: "primary", "all" (every physical
+        monitor) or a list of mss indices (1 = primary). Unknown indices are
+        dropped; an empty result falls back to this grabber's monitor.
+        """
+        self._ensure_open()
+        if selection == "primary":
+            return [self.monitor]
+        if selection == "all":
+            return self.sct.monitors[1:] or [self.monitor]
+        chosen = [self.sct.monitors[i] for i in selection if 0 < i < len(self.sct.monitors)]
+        return chosen or [self.monitor]
+
+    def virtual_screen(self):
+        """Bounding box of all monitors (mss monitor 0)"""
+        self._ensure_open()
+        return self.sct.monitors[0]
+
+    def close(self):
+        if self.sct is not None:
+            self.sct.close()
+            self.sct = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_thread_grabbers = threading.local()
+
+
+def thread_grabber() -> ScreenGrabber:
+    """The calling thread's ScreenGrabber, created on first use"""
+    grabber = getattr(_thread_grabbers, "grabber", None)
+    if grabber is None:
+        grabber = _thread_grabbers.grabber = ScreenGrabber()
+    return grabber
 
-        buffer = BytesIO()
-        img.save(
-            buffer,
-            format="JPEG",
-            quality=JPEG_QUALITY,
-            optimize=True
-        )
 
+class ScreenChangeDetector:
+    """
+    Cheap "did the screen change?" check on the raw grab, before any resize or
+    encode: a sparse grid of green-channel samples (a good luma proxy) is
+    compared with the same grid from the last uploaded screen.
+
+    Comparing against the last upload rather than the last grab means slow
+    changes (a page scrolled a line at a time) still add up to an upload.
+    """
+    def __init__(self, grid_width=CHANGE_GRID_WIDTH, pixel_threshold=CHANGE_PIXEL_THRESHOLD,
+                 min_fraction=CHANGE_MIN_FRACTION, max_staleness=MAX_STALENESS):
+        self.grid_width = grid_width
+        self.pixel_threshold = pixel_threshold
+        self.min_fraction = min_fraction
+        self.max_staleness = max_staleness
+        self._reference = None
+        self._pending = None
+        self._sent_at = None
+        self.skipped = 0
+
+    def signature(self, screenshot):
+        """Sampled green channel of a BGRA screenshot as a small int16 grid (no full-size copy)"""
+        width, height = screenshot.size
+        pixels = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(height, -1, 4)
+        step = max(1, width // self.grid_width)
+        return pixels[::step, :width:step, 1].astype(np.int16)
+
+    def should_send(self, screenshot, now):
+        """
+        True if screenshot differs enough from the last uploaded one, or the
+        last upload is older than max_staleness. Call mark_sent() after uploading.
+        """
+        signature = self.signature(screenshot)
+        if (self._reference is None or self._reference.shape != signature.shape
+                or now - self._sent_at >= self.max_staleness):
+            self._pending = signature
+            return True
+
+        changed = np.count_nonzero(np.abs(signature - self._reference) > self.pixel_threshold)
+        if changed >= self.min_fraction * signature.size:
+            self._pending = signature
+            return True
+        self.skipped += 1
+        return False
+
+    def mark_sent(self, now):
+        """Make the screen last passed by should_send() the new reference"""
+        self._reference = self._pending
+        self._sent_at = now
+
+
+class ScreenEncoder:
+    """Downscale + compress stage for screenshots, with selectable resize filter and codec"""
+    FORMATS = {
+        "jpeg": ("JPEG", "image/jpeg", "screenshot.jpg"),
+        "webp": ("WEBP", "image/webp", "screenshot.webp"),
+    }
+    FILTERS = {
+        "box": Image.BOX,
+        "bilinear": Image.BILINEAR,
+        "lanczos": Image.LANCZOS,
+    }
+
+    def __init__(self, max_width=MAX_WIDTH, resize=RESIZE_METHOD, fmt=ENCODE_FORMAT,
+                 quality=JPEG_QUALITY, optimize=JPEG_OPTIMIZE):
+        if resize != "reduce" and resize not in self.FILTERS:
+            raise ValueError(f"Unknown resize method: {resize}")
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unknown image format: {fmt}")
+        self.max_width = max_width
+        self.resize_method = resize
+        self.format = fmt
+        self.quality = quality
+        self.optimize = optimize
+
+    @property
+    def mime_type(self):
+        return self.FORMATS[self.format][1]
+
+    @property
+    def filename(self):
+        return self.FORMATS[self.format][2]
+
+    def resize(self, img):
+        """Shrink img to max_width, preserving aspect ratio"""
+        if img.width <= self.max_width:
+            return img
+        size = (self.max_width, int(img.height * self.max_width / img.width))
+        if self.resize_method == "reduce":
+            # Integer box shrink first (cheap, and averages away aliasing), then a small bilinear step
+            factor = img.width // self.max_width
+            if factor >= 2:
+                img = img.reduce(factor)
+            return img if img.size == size else img.resize(size, Image.BILINEAR)
+        return img.resize(size, self.FILTERS[self.resize_method])
+
+    def encode(self, img) -> bytes:
+        """Compress an already resized image"""
+        buffer = BytesIO()
+        if self.format == "jpeg":
+            img.save(buffer, format="JPEG", quality=self.quality, optimize=self.optimize)
+        else:
+            img.save(buffer, format="WEBP", quality=self.quality, method=0)  # method 0 = fastest
         return buffer.getvalue()
 
+    def __call__(self, img) -> bytes:
+        return self.encode(self.resize(img))
+
+
+DEFAULT_ENCODER = ScreenEncoder()
+
+
+def screenshot_image(screenshot):
+    """
+    Wrap an mss screenshot's BGRA buffer as a PIL image without copying it.
+
+    The bands are really B, G, R, X - resize first, then fix the channel
+    order on the small image with bgrx_to_rgb().
+    """
+    return Image.frombuffer("RGBX", screenshot.size, screenshot.raw, "raw", "RGBX", 0, 1)
+
+
+def bgrx_to_rgb(img):
+    """Reorder a B, G, R, X image (from screenshot_image) into a real RGB image"""
+    b, g, r, _ = img.split()
+    return Image.merge("RGB", (r, g, b))
+
+
+def encode_screenshot(screenshot, encoder: ScreenEncoder = None) -> bytes:
+    """
+    Downscale an mss screenshot and encode it (JPEG by default, see ScreenEncoder).
+
+    Works on the raw BGRA buffer and converts channels only after downscaling,
+    so no full-resolution RGB copy is made (mss's .rgb plus Image.frombytes
+    used to allocate two, ~25 MB each for a 4K screen).
+    """
+    encoder = encoder or DEFAULT_ENCODER
+    small = encoder.resize(screenshot_image(screenshot))
+    return encoder.encode(bgrx_to_rgb(small))
+
+
+def capture_binary(grabber: ScreenGrabber = None, encoder: ScreenEncoder = None) -> bytes:
+    """Capture full screen and return JPEG bytes (reusing this thread's screen connection)."""
+    grabber = grabber or thread_grabber()
+    return encode_screenshot(grabber.grab(), encoder)
+
+
+def clip_region(region, bounds):
+    """Intersection of two mss rectangles, or None if they don't overlap"""
+    left = max(region["left"], bounds["left"])
+    top = max(region["top"], bounds["top"])
+    right = min(region["left"] + region["width"], bounds["left"] + bounds["width"])
+    bottom = min(region["top"] + region["height"], bounds["top"] + bounds["height"])
+    if right <= left or bottom <= top:
+        return None
+    return {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+
+def active_window_rect():
+    """
+    Screen rectangle of the focused window as an mss region, or None if it
+    can't be found (no window manager, missing helper, unsupported platform).
+
+    Windows: GetForegroundWindow/GetWindowRect. macOS: the frontmost normal
+    window from Quartz (pyobjc). Linux/X11: xdotool.
+    """
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+            user32 = ctypes.windll.user32
+            hwnd = user32.GetForegroundWindow()
+            rect = wintypes.RECT()
+            if not hwnd or not user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+                return None
+            left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+
+        elif sys.platform == "darwin":
+            from Quartz import (CGWindowListCopyWindowInfo, kCGNullWindowID,
+                                kCGWindowListExcludeDesktopElements, kCGWindowListOptionOnScreenOnly)
+            windows = CGWindowListCopyWindowInfo(
+                kCGWindowListOptionOnScreenOnly | kCGWindowListExcludeDesktopElements, kCGNullWindowID)
+            # Front to back; layer 0 is normal application windows (menu bar, dock etc. are above it)
+            front = next((w for w in windows if w.get("kCGWindowLayer") == 0), None)
+            if front is None:
+                return None
+            bounds = front["kCGWindowBounds"]
+            left, top = int(bounds["X"]), int(bounds["Y"])
+            right, bottom = left + int(bounds["Width"]), top + int(bounds["Height"])
+
+        else:
+            output = subprocess.run(["xdotool", "getactivewindow", "getwindowgeometry", "--shell"],
+                                    capture_output=True, text=True, timeout=1, check=True).stdout
+            values = dict(line.split("=", 1) for line in output.splitlines() if "=" in line)
+            left, top = int(values["X"]), int(values["Y"])
+            right, bottom = left + int(values["WIDTH"]), top + int(values["HEIGHT"])
+
+    except (ImportError, OSError, KeyError, ValueError, subprocess.SubprocessError):
+        return None
+
+    if right <= left or bottom <= top:
+        return None
+    return {"left": left, "top": top, "width": right - left, "height": bottom - top}
+
+
+def composite(images):
+    """Paste RGB images left to right, top aligned, on one black canvas"""
+    canvas = Image.new("RGB", (sum(img.width for img in images), max(img.height for img in images)))
+    left = 0
+    for img in images:
+        canvas.paste(img, (left, 0))
+        left += img.width
+    return canvas
+
+
+class MultiScreenCapture:
+    """
+    One capture cycle over several screens: every selected monitor (or just
+    the focused window, when CAPTURE_ACTIVE_WINDOW is on and it can be found),
+    encoded for a single webhook request as either one side-by-side composite
+    or one image per screen.
+
+    Grabs run on the calling thread - mss handles are thread bound and a grab
+    is a fast copy. The per-screen resize/encode goes to a small thread pool;
+    Pillow releases the GIL while resampling and compressing, so screens are
+    encoded in parallel. Each screen has its own ScreenChangeDetector and the
+    cycle is skipped only when none of them changed.
+    """
+    def __init__(self, grabber: ScreenGrabber = None, encoder: ScreenEncoder = None,
+                 monitors=CAPTURE_MONITORS, layout=MULTI_MONITOR_LAYOUT,
+                 active_window=CAPTURE_ACTIVE_WINDOW, workers=ENCODE_WORKERS):
+        """
+        Args:
+            grabber: Screen connection to grab with (default: this thread's; the caller closes it)
+            encoder: ScreenEncoder for each screen (default: DEFAULT_ENCODER)
+            monitors: "primary", "all" or a list of mss monitor indices
+            layout: "composite" or "multipart"
+            active_window: Grab the focused window's rectangle instead, when found
+            workers: Encode threads
+        """
+        if layout not in ("composite", "multipart"):
+            raise ValueError(f"Unknown multi-monitor layout: {layout}")
+        self.grabber = grabber or thread_grabber()
+        self.encoder = encoder or DEFAULT_ENCODER
+        self.monitor_selection = monitors
+        self.layout = layout
+        self.active_window = active_window
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ScreenEncode")
+        self.detectors = {}
+        self._pending = ()
+        self.skipped = 0
+        self.window_misses = 0
+
+    def regions(self):
+        """
+        [(key, mss region)] to grab this cycle. Keys identify the screen for
+        change detection: "window", or the monitor's position in the selection.
+        """
+        if self.active_window:
+            rect = active_window_rect()
+            region = rect and clip_region(rect, self.grabber.virtual_screen())
+            if region:
+                return [("window", region)]
+            self.window_misses += 1
+        return list(enumerate(self.grabber.monitors(self.monitor_selection)))
+
+    def grab(self):
+        """[(key, ScreenShot)] for this cycle"""
+        return [(key, self.grabber.grab(region)) for key, region in self.regions()]
+
+    def render(self, screenshots):
+        """
+        Encode screenshots (mss ScreenShots) for upload.
+
+        Returns:
+            List of encoded images: one composite, or one per screenshot
+        """
+        if len(screenshots) == 1:
+            return [encode_screenshot(screenshots[0], self.encoder)]
+        if self.layout == "multipart":
+            return list(self.pool.map(lambda shot: encode_screenshot(shot, self.encoder), screenshots))
+        small = self.pool.map(lambda shot: bgrx_to_rgb(self.encoder.resize(screenshot_image(shot))),
+                              screenshots)
+        return [self.encoder.encode(composite(list(small)))]
+
+    def capture(self, now=None):
+        """
+        Grab and encode one cycle.
+
+        Args:
+            now: Monotonic time for change detection; None always encodes
+
+        Returns:
+            List of encoded images (see render), or None when no screen changed.
+            Call mark_sent() after uploading.
+        """
+        shots = self.grab()
+        if now is not None:
+            detectors = [self.detectors.setdefault(key, ScreenChangeDetector()) for key, _ in shots]
+            # Check every screen (not any()) so each detector keeps its pending signature
+            changed = [d.should_send(shot, now) for d, (_, shot) in zip(detectors, shots)]
+            if not any(changed):
+                self.skipped += 1
+                return None
+            self._pending = detectors
+        return self.render([shot for _, shot in shots])
+
+    def mark_sent(self, now):
+        """Make the screens of the last capture() the new change references"""
+        for detector in self._pending:
+            detector.mark_sent(now)
+        self._pending = ()
+
+    def close(self):
+        """Stop the encode pool (the grabber belongs to the caller)"""
+        self.pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 
 def main():
     print("Running Screen Capture (Solo)")
@@ -52,7 +455,7 @@ def main():
     while True:
         try:
             image_bytes = capture_binary()
-            send_to_webhook(image_bytes)
+            send_to_webhook(image_bytes, "", DEFAULT_ENCODER.mime_type, DEFAULT_ENCODER.filename)
             print("✅ Screenshot sent (binary)")
 
         except Exception as e: